@@ -2,19 +2,25 @@
 # See LICENSE file for licensing details.
 
 """Module for interacting with qemu image builder."""
+
 # nosec: B603 is added throughout subprocess calls, make sure that they are running trusted user
 # inputs.
+# The chroot build steps, including the stage1 image cache, are kept together in this module.
+# pylint: disable=too-many-lines
 
+import concurrent.futures
 import contextlib
 import http
 import http.client
 import logging
+import math
 import pwd
 import shutil
 
 # Ignore B404:blacklist since all subprocesses are run with predefined executables.
 import subprocess  # nosec
 import tarfile
+import time
 import urllib.error
 import urllib.request
 import urllib.response
@@ -33,6 +39,8 @@ from github_runner_image_builder.errors import (
     ImageConnectError,
     ImageResizeError,
     NetworkBlockDeviceError,
+    OpenstackError,
+    OverlayImageError,
     PermissionConfigurationError,
     ResizePartitionError,
     RunnerDownloadError,
@@ -49,13 +57,27 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-APT_DEPENDENCIES = [
+APT_DEPENDENCIES = (
     "qemu-utils",  # used for qemu utilities tools to build and resize image
     "cloud-utils",  # used for growpart.
     "golang-go",  # used to build yq from source.
-]
+)
 APT_NONINTERACTIVE_ENV = {"DEBIAN_FRONTEND": "noninteractive"}
 SNAP_GO = "go"
+_APT_INSTALL_HOST_ARGV = (
+    "/usr/bin/apt-get",
+    "install",
+    "-y",
+    "--no-install-recommends",
+    *APT_DEPENDENCIES,
+)
+_APT_INSTALL_IMAGE_ARGV = (
+    "/usr/bin/apt-get",
+    "install",
+    "-y",
+    "--no-install-recommends",
+    *config.IMAGE_DEFAULT_APT_PACKAGES,
+)
 
 # Constants for mounting images
 IMAGE_MOUNT_DIR = Path("/mnt/ubuntu-image/")
@@ -91,6 +113,48 @@ MOUNTED_YQ_BIN_PATH = IMAGE_MOUNT_DIR / "usr/bin/yq"
 IMAGE_HWE_PKG_FORMAT = "linux-generic-hwe-{VERSION}"
 SYSCTL_CONF_PATH = Path("/etc/sysctl.conf")
 
+# Constants for the stage1 image, the build image state shared by all builds of the same base image
+# and architecture. Bump STAGE1_VERSION whenever the stage1 build steps change.
+STAGE1_VERSION = 1
+STAGE1_IMAGE_DIR = Path.home() / ".cache/github-runner-image-builder/stage1"
+# Rebuild the stage1 image daily to pick up package and base image updates.
+STAGE1_MAX_AGE = 24 * 60 * 60  # seconds
+OVERLAY_IMAGE_PATH = Path("build-overlay.img")
+
+# The end-to-end time limit of a single image build.
+BUILD_TIMEOUT = 2 * 60 * 60  # seconds
+
+
+# The deadline only needs to hand out bounded timeouts.
+class _Deadline:  # pylint: disable=too-few-public-methods
+    """A deadline shared by the subprocess calls of a single image build.
+
+    Attributes:
+        end: The monotonic clock time after which no subprocess is allowed to run.
+    """
+
+    def __init__(self, timeout: float = math.inf):
+        """Initialize the deadline.
+
+        Args:
+            timeout: Time in seconds from now until the deadline.
+        """
+        self.end = time.monotonic() + timeout
+
+    def timeout(self, max_timeout: float) -> float:
+        """Get the subprocess timeout bounded by the time remaining until the deadline.
+
+        Args:
+            max_timeout: The maximum time in seconds the subprocess is allowed to run.
+
+        Returns:
+            The subprocess timeout in seconds.
+        """
+        return max(0, min(max_timeout, self.end - time.monotonic()))
+
+
+_NO_DEADLINE = _Deadline()
+
 
 def initialize() -> None:
     """Configure the host machine to build images."""
@@ -115,7 +179,7 @@ def _install_dependencies() -> None:
         )  # nosec: B603
         logger.info("apt-get update out: %s", output)
         output = subprocess.check_output(
-            ["/usr/bin/apt-get", "install", "-y", "--no-install-recommends", *APT_DEPENDENCIES],
+            _APT_INSTALL_HOST_ARGV,
             encoding="utf-8",
             env=APT_NONINTERACTIVE_ENV,
             timeout=30 * 60,
@@ -174,31 +238,144 @@ def run(
     Returns:
         The built image ID.
     """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        # Authenticate to OpenStack in the background while the image is being built.
+        connection_future = executor.submit(store.connect, cloud_name=cloud_name)
+        try:
+            _build_image(image_config=image_config)
+        except BaseException:
+            # The image is not uploaded, close the connection once it is established.
+            with contextlib.suppress(OpenstackError):
+                connection_future.result().close()
+            raise
+        with connection_future.result() as connection:
+            image = store.upload_image(
+                arch=image_config.arch,
+                cloud_name=cloud_name,
+                image_name=image_config.name,
+                image_path=config.IMAGE_OUTPUT_PATH,
+                keep_revisions=keep_revisions,
+                connection=connection,
+            )
+    return image.id
+
+
+def _build_image(image_config: config.ImageConfig) -> None:
+    """Build the image and compress it to IMAGE_OUTPUT_PATH.
+
+    Args:
+        image_config: The target image configuration values.
+
+    Raises:
+        BuildImageError: If there was an error building the image.
+    """
+    deadline = _Deadline(timeout=BUILD_TIMEOUT)
     # ensure clean state - if there were errors within the chroot environment (e.g. network error)
     # this guarantees retry-ability
     _unmount_build_path()
     _disconnect_image_to_network_block_device(check=False)
 
     IMAGE_MOUNT_DIR.mkdir(parents=True, exist_ok=True)
-    logger.info("Downloading base image.")
-    base_image_path = cloud_image.download_and_validate_image(
-        arch=image_config.arch, base_image=image_config.base
+    stage1_image_path = _get_stage1_image(
+        arch=image_config.arch, base_image=image_config.base, deadline=deadline
     )
+    logger.info("Creating build image on top of stage1 image %s.", stage1_image_path)
+    build_image_path = _create_overlay_image(backing_image_path=stage1_image_path)
+    logger.info("Connecting image to network block device.")
+    _connect_image_to_network_block_device(image_path=build_image_path)
+
+    logger.info("Setting up chroot environment.")
+    logger.info("Replacing resolv.conf.")
+    _replace_mounted_resolv_conf()
+    try:
+        with ChrootContextManager(IMAGE_MOUNT_DIR):
+            logger.info("Installing GitHub runner.")
+            _install_github_runner(arch=image_config.arch, version=image_config.runner_version)
+            logger.info("Changing ownership of home directory.")
+            _chown_home(deadline=deadline)
+    except ChrootBaseError as exc:
+        logger.exception("Error chrooting into %s", IMAGE_MOUNT_DIR)
+        raise BuildImageError from exc
+
+    # Unmount the image first so that its filesystem is cleanly flushed before disconnecting.
+    logger.info("Unmounting build path.")
+    _unmount_build_path()
+    logger.info("Disconnecting image to network block device.")
+    _disconnect_image_to_network_block_device(check=True)
+
+    logger.info("Compressing image.")
+    _compress_image(build_image_path, deadline=deadline)
+
+
+def _get_stage1_image(
+    arch: config.Arch, base_image: config.BaseImage, deadline: _Deadline
+) -> Path:
+    """Get the stage1 image, building it if no fresh stage1 image is cached.
+
+    Args:
+        arch: The architecture of the image.
+        base_image: The ubuntu base image OS.
+        deadline: The build deadline to bound the subprocess timeouts with.
+
+    Returns:
+        The path to the stage1 image.
+    """
+    stage1_image_path = STAGE1_IMAGE_DIR / f"{base_image.value}-{arch.value}-v{STAGE1_VERSION}.img"
+    if _is_stage1_image_fresh(image_path=stage1_image_path):
+        logger.info("Reusing stage1 image %s.", stage1_image_path)
+        return stage1_image_path
+    logger.info("Downloading base image.")
+    base_image_path = cloud_image.download_and_validate_image(arch=arch, base_image=base_image)
+    logger.info("Building stage1 image.")
+    _build_stage1_image(image_path=base_image_path, base_image=base_image, deadline=deadline)
+    STAGE1_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.move(base_image_path, stage1_image_path)
+    return stage1_image_path
+
+
+def _is_stage1_image_fresh(image_path: Path) -> bool:
+    """Check whether the stage1 image exists and is recent enough to be reused.
+
+    Args:
+        image_path: The path to the stage1 image.
+
+    Returns:
+        True if the stage1 image can be reused. False otherwise.
+    """
+    try:
+        return time.time() - image_path.stat().st_mtime < STAGE1_MAX_AGE
+    except FileNotFoundError:
+        return False
+
+
+def _build_stage1_image(
+    image_path: Path, base_image: config.BaseImage, deadline: _Deadline
+) -> None:
+    """Install the components shared by all builds of the same base image and architecture.
+
+    Args:
+        image_path: The base image to build the stage1 image from.
+        base_image: The ubuntu base image OS.
+        deadline: The build deadline to bound the subprocess timeouts with.
+
+    Raises:
+        BuildImageError: If there was an error building the image.
+    """
     logger.info("Resizing base image.")
-    _resize_image(image_path=base_image_path)
+    _resize_image(image_path=image_path)
     logger.info("Connecting image to network block device.")
-    _connect_image_to_network_block_device(image_path=base_image_path)
+    _connect_image_to_network_block_device(image_path=image_path)
     logger.info("Resizing partitions.")
-    _resize_mount_partitions()
+    _resize_mount_partitions(deadline=deadline)
     logger.info("Installing YQ from source.")
-    _install_yq()
+    _install_yq(deadline=deadline)
 
     logger.info("Setting up chroot environment.")
     logger.info("Replacing resolv.conf.")
     _replace_mounted_resolv_conf()
     try:
         with ChrootContextManager(IMAGE_MOUNT_DIR):
-            _install_apt_packages(base_image=image_config.base)
+            _install_apt_packages(base_image=base_image, deadline=deadline)
             logger.info("Disabling unattended upgrades.")
             _disable_unattended_upgrades()
             logger.info("Enabling network optimization policy.")
@@ -208,29 +385,58 @@ def run(
             logger.info("Configuring /usr/local/bin directory.")
             _configure_usr_local_bin()
             logger.info("Installing Yarn.")
-            _install_yarn()
-            logger.info("Installing GitHub runner.")
-            _install_github_runner(arch=image_config.arch, version=image_config.runner_version)
-            logger.info("Changing ownership of home directory.")
-            _chown_home()
+            _install_yarn(deadline=deadline)
     except ChrootBaseError as exc:
         logger.exception("Error chrooting into %s", IMAGE_MOUNT_DIR)
         raise BuildImageError from exc
 
+    # Unmount the image first so that its filesystem is cleanly flushed before disconnecting.
+    logger.info("Unmounting build path.")
+    _unmount_build_path()
     logger.info("Disconnecting image to network block device.")
     _disconnect_image_to_network_block_device(check=True)
 
-    logger.info("Compressing image.")
-    _compress_image(base_image_path)
-
-    image = store.upload_image(
-        arch=image_config.arch,
-        cloud_name=cloud_name,
-        image_name=image_config.name,
-        image_path=config.IMAGE_OUTPUT_PATH,
-        keep_revisions=keep_revisions,
-    )
-    return image.id
+
+def _create_overlay_image(backing_image_path: Path) -> Path:
+    """Create a qcow2 overlay image backed by the given image.
+
+    Args:
+        backing_image_path: The image to use as the read-only backing file.
+
+    Raises:
+        OverlayImageError: If there was an error creating the overlay image.
+
+    Returns:
+        The path to the overlay image.
+    """
+    OVERLAY_IMAGE_PATH.unlink(missing_ok=True)
+    try:
+        output = subprocess.check_output(  # nosec: B603
+            [
+                "/usr/bin/qemu-img",
+                "create",
+                "-f",  # overlay image format
+                "qcow2",
+                "-F",  # backing image format
+                "qcow2",
+                "-b",
+                str(backing_image_path.absolute()),
+                str(OVERLAY_IMAGE_PATH),
+            ],
+            timeout=60,
+        )
+        logger.info("qemu-img create overlay out: %s", output)
+    except subprocess.CalledProcessError as exc:
+        logger.exception(
+            "Error creating overlay image, cmd: %s, code: %s, err: %s",
+            exc.cmd,
+            exc.returncode,
+            exc.output,
+        )
+        raise OverlayImageError from exc
+    except subprocess.SubprocessError as exc:
+        raise OverlayImageError from exc
+    return OVERLAY_IMAGE_PATH
 
 
 def _disconnect_image_to_network_block_device(check: bool = True) -> None:
@@ -404,20 +610,24 @@ def _mount_network_block_device_partition() -> None:
     logger.info("mount nbd0p1 out: %s", output)
 
 
-def _resize_mount_partitions() -> None:
+def _resize_mount_partitions(deadline: _Deadline = _NO_DEADLINE) -> None:
     """Resize the block partition to fill available space.
 
+    Args:
+        deadline: The build deadline to bound the subprocess timeouts with.
+
     Raises:
         ResizePartitionError: If there was an error resizing network block device partitions.
     """
     try:
         output = subprocess.check_output(  # nosec: B603
-            ["/usr/bin/growpart", str(NETWORK_BLOCK_DEVICE_PATH), "1"], timeout=10 * 60
+            ["/usr/bin/growpart", str(NETWORK_BLOCK_DEVICE_PATH), "1"],
+            timeout=deadline.timeout(10 * 60),
         )
         logger.info("growpart out: %s", output)
         output = subprocess.check_output(  # nosec: B603
             ["/usr/sbin/resize2fs", str(NETWORK_BLOCK_DEVICE_PARTITION_PATH)],
-            timeout=10 * 60,
+            timeout=deadline.timeout(10 * 60),
         )
         logger.info("resize2fs out: %s", output)
     except subprocess.CalledProcessError as exc:
@@ -434,9 +644,12 @@ def _resize_mount_partitions() -> None:
 
 
 @retry(tries=3, delay=5, max_delay=30, backoff=2, local_logger=logger)
-def _install_yq() -> None:
+def _install_yq(deadline: _Deadline = _NO_DEADLINE) -> None:
     """Build and install yq from source.
 
+    Args:
+        deadline: The build deadline to bound the subprocess timeouts with.
+
     Raises:
         YQBuildError: If there was an error building yq from source.
     """
@@ -444,23 +657,23 @@ def _install_yq() -> None:
         if not YQ_REPOSITORY_PATH.exists():
             output = subprocess.check_output(  # nosec: B603
                 ["/usr/bin/git", "clone", str(YQ_REPOSITORY_URL), str(YQ_REPOSITORY_PATH)],
-                timeout=60 * 10,
+                timeout=deadline.timeout(60 * 10),
             )
             logger.info("git clone out: %s", output)
         else:
             output = subprocess.check_output(  # nosec: B603
                 ["/usr/bin/git", "-C", str(YQ_REPOSITORY_PATH), "pull"],
-                timeout=60 * 10,
+                timeout=deadline.timeout(60 * 10),
             )
             logger.info("git pull out: %s", output)
         output = subprocess.check_output(  # nosec: B603
             ["/snap/bin/go", "mod", "tidy", "-C", str(YQ_REPOSITORY_PATH)],
-            timeout=60 * 10,
+            timeout=deadline.timeout(60 * 10),
         )
         logger.info("go mod tidy out: %s", output)
         output = subprocess.check_output(  # nosec: B603
             ["/snap/bin/go", "build", "-C", str(YQ_REPOSITORY_PATH), "-o", str(HOST_YQ_BIN_PATH)],
-            timeout=20 * 60,
+            timeout=deadline.timeout(20 * 60),
         )
         logger.info("go build out: %s", output)
         shutil.copy(HOST_YQ_BIN_PATH, MOUNTED_YQ_BIN_PATH)
@@ -483,29 +696,26 @@ def _replace_mounted_resolv_conf() -> None:
     shutil.copy(str(HOST_RESOLV_CONF_PATH), str(MOUNTED_RESOLV_CONF_PATH))
 
 
-def _install_apt_packages(base_image: config.BaseImage) -> None:
+def _install_apt_packages(
+    base_image: config.BaseImage, deadline: _Deadline = _NO_DEADLINE
+) -> None:
     """Install APT packages on the chroot env.
 
     Args:
         base_image: The target base image to fetch HWE kernel for.
+        deadline: The build deadline to bound the subprocess timeouts with.
     """
     # operator_libs_linux apt package uses dpkg -l and that does not work well with
     # chroot env, hence use subprocess run.
     output = subprocess.check_output(
         ["/usr/bin/apt-get", "update", "-y"],
-        timeout=60 * 10,
+        timeout=deadline.timeout(60 * 10),
         env=APT_NONINTERACTIVE_ENV,
     )  # nosec: B603
     logger.info("apt-get update out: %s", output)
     output = subprocess.check_output(  # nosec: B603
-        [
-            "/usr/bin/apt-get",
-            "install",
-            "-y",
-            "--no-install-recommends",
-            *config.IMAGE_DEFAULT_APT_PACKAGES,
-        ],
-        timeout=60 * 20,
+        _APT_INSTALL_IMAGE_ARGV,
+        timeout=deadline.timeout(60 * 20),
         env=APT_NONINTERACTIVE_ENV,
     )
     logger.info("apt-get install out: %s", output)
@@ -519,7 +729,7 @@ def _install_apt_packages(base_image: config.BaseImage) -> None:
             "--install-recommends",
             IMAGE_HWE_PKG_FORMAT.format(VERSION=config.BaseImage.get_version(base_image)),
         ],
-        timeout=60 * 20,
+        timeout=deadline.timeout(60 * 20),
         env=APT_NONINTERACTIVE_ENV,
     )
     logger.info("apt-get install HWE kernel out: %s", output)
@@ -644,20 +854,23 @@ def _configure_usr_local_bin() -> None:
         raise PermissionConfigurationError from exc
 
 
-def _install_yarn() -> None:
+def _install_yarn(deadline: _Deadline = _NO_DEADLINE) -> None:
     """Install yarn using NPM.
 
+    Args:
+        deadline: The build deadline to bound the subprocess timeouts with.
+
     Raises:
         YarnInstallError: If there was an error installing external package.
     """
     try:
         # 2024/04/26 There's a potential security risk here, npm is subject to toolchain attacks.
         output = subprocess.check_output(
-            ["/usr/bin/npm", "install", "--global", "yarn"], timeout=60 * 5
+            ["/usr/bin/npm", "install", "--global", "yarn"], timeout=deadline.timeout(60 * 5)
         )  # nosec: B603
         logger.info("npm install yarn out: %s", output)
         output = subprocess.check_output(
-            ["/usr/bin/npm", "cache", "clean", "--force"], timeout=60
+            ["/usr/bin/npm", "cache", "clean", "--force"], timeout=deadline.timeout(60)
         )  # nosec: B603
         logger.info("npm cache clean out: %s", output)
     except subprocess.CalledProcessError as exc:
@@ -758,9 +971,12 @@ def _get_github_runner_version(version: str) -> str:
     return latest_version.lstrip("v")
 
 
-def _chown_home() -> None:
+def _chown_home(deadline: _Deadline = _NO_DEADLINE) -> None:
     """Change the ownership of Ubuntu home directory.
 
+    Args:
+        deadline: The build deadline to bound the subprocess timeout with.
+
     Raises:
         HomeDirectoryChangeOwnershipError: If there was an error changing the home directory
         ownership to ubuntu:ubuntu.
@@ -768,7 +984,7 @@ def _chown_home() -> None:
     try:
         subprocess.check_call(
             ["/usr/bin/chown", "--recursive", "ubuntu:ubuntu", "/home/ubuntu"],  # nosec
-            timeout=60 * 10,
+            timeout=deadline.timeout(60 * 10),
         )
     except subprocess.CalledProcessError as exc:
         logger.exception(
@@ -785,11 +1001,12 @@ def _chown_home() -> None:
 
 # Image compression might fail for arbitrary reasons - retrying usually solves this.
 @retry(tries=5, delay=5, max_delay=60, backoff=2, local_logger=logger)
-def _compress_image(image: Path) -> None:
+def _compress_image(image: Path, deadline: _Deadline = _NO_DEADLINE) -> None:
     """Compress the image.
 
     Args:
         image: The image to compress.
+        deadline: The build deadline to bound the subprocess timeout with.
 
     Raises:
         ImageCompressError: If there was something wrong compressing the image.
@@ -808,7 +1025,7 @@ def _compress_image(image: Path) -> None:
                 str(image),
                 str(config.IMAGE_OUTPUT_PATH),
             ],
-            timeout=60 * 10,
+            timeout=deadline.timeout(60 * 10),
         )
         logger.info("qemu-img convert compress out: %s", output)
     except subprocess.CalledProcessError as exc:
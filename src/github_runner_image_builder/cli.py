@@ -4,19 +4,32 @@
 """Main entrypoint for github-runner-image-builder cli application."""
 
 import os
-
-# Subprocess module is used to execute trusted commands
-import subprocess  # nosec: B404
+import sys
 import urllib.parse
-from pathlib import Path
 
 import click
 
-from github_runner_image_builder import builder, config, logging, openstack_builder, store
+# The builder and store modules are imported within the commands that use them. They depend on
+# the OpenStack SDK which is slow to import and not needed for help output or argument validation.
+from github_runner_image_builder import config, logging
 
 # Bandit thinks this is a hardcoded secret.
 SECRET_PREFIX = "IMAGE_BUILDER_SECRET_"  # nosec
 
+# Options shared between the init and run commands.
+_ARCH_CHOICE = click.Choice((config.Arch.ARM64, config.Arch.X64))
+_experimental_external_option = click.option(
+    "--experimental-external",
+    default=False,
+    help="EXPERIMENTAL: Use external Openstack builder to build images.",
+)
+_prefix_option = click.option(
+    "--prefix",
+    default="",
+    help="Name of the OpenStack resources to prefix with. Used to run the image builder in "
+    "parallel under same OpenStack project. Ignored if --experimental-external is not enabled",
+)
+
 
 @click.option(
     "--log-level",
@@ -37,7 +50,7 @@ def main(log_level: str | int) -> None:
 @main.command(name="init")
 @click.option(
     "--arch",
-    type=click.Choice((config.Arch.ARM64, config.Arch.X64)),
+    type=_ARCH_CHOICE,
     default=None,
     help="Image architecture to initialize for. Defaults the host architecture. "
     "Ignored if --experimental-external is not enabled",
@@ -48,17 +61,8 @@ def main(log_level: str | int) -> None:
     help="The cloud to use from the clouds.yaml file. The CLI looks for clouds.yaml in paths of "
     "the following order: current directory, ~/.config/openstack, /etc/openstack.",
 )
-@click.option(
-    "--experimental-external",
-    default=False,
-    help="EXPERIMENTAL: Use external Openstack builder to build images.",
-)
-@click.option(
-    "--prefix",
-    default="",
-    help="Name of the OpenStack resources to prefix with. Used to run the image builder in "
-    "parallel under same OpenStack project. Ignored if --experimental-external is not enabled",
-)
+@_experimental_external_option
+@_prefix_option
 def initialize(
     arch: config.Arch | None, cloud_name: str, experimental_external: bool, prefix: str
 ) -> None:
@@ -70,6 +74,9 @@ def initialize(
         experimental_external: Whether to use external Openstack builder to build images.
         prefix: The prefix to use for OpenStack resource names.
     """
+    # pylint: disable-next=import-outside-toplevel
+    from github_runner_image_builder import builder, openstack_builder
+
     if not experimental_external:
         builder.initialize()
         return
@@ -94,10 +101,11 @@ def get_latest_build_id(cloud_name: str, image_name: str) -> None:
             paths of the following order: current directory, ~/.config/openstack, /etc/openstack.
         image_name: The image name uploaded to Openstack.
     """
-    click.echo(
-        message=store.get_latest_build_id(cloud_name=cloud_name, image_name=image_name),
-        nl=False,
-    )
+    # pylint: disable-next=import-outside-toplevel
+    from github_runner_image_builder import store
+
+    # The ID is consumed by scripts, write it as is without click's terminal handling.
+    sys.stdout.write(store.get_latest_build_id(cloud_name=cloud_name, image_name=image_name))
 
 
 # The arguments are necessary input for click validation function.
@@ -151,12 +159,29 @@ def _parse_url(
     return parse_result
 
 
+# The arguments are necessary input for click validation function.
+def _parse_base_image(
+    ctx: click.Context, param: click.Parameter, value: str  # pylint: disable=unused-argument
+) -> config.BaseImage:
+    """Parse the base image name or LTS version tag input.
+
+    Args:
+        ctx: Click context argument.
+        param: Click parameter argument.
+        value: The value passed into --base-image option.
+
+    Returns:
+        The base image.
+    """
+    return config.BaseImage.from_str(value)
+
+
 @main.command(name="run")
 @click.argument("cloud_name")
 @click.argument("image_name")
 @click.option(
     "--arch",
-    type=click.Choice((config.Arch.ARM64, config.Arch.X64)),
+    type=_ARCH_CHOICE,
     default=None,
     help="Image architecture to initialize for. Defaults the host architecture.",
 )
@@ -164,6 +189,7 @@ def _parse_url(
     "-b",
     "--base-image",
     type=click.Choice(config.BASE_CHOICES),
+    callback=_parse_base_image,
     default="noble",
     help=("The Ubuntu base image to use as build base."),
 )
@@ -173,18 +199,18 @@ def _parse_url(
     callback=_parse_url,
     default=None,
     help=(
-        "The DockerHub cache to use to instantiate builder VMs with. Useful when creating images"
+        "The DockerHub cache to use to instantiate builder VMs with. Useful when creating images "
         "with MicroK8s."
     ),
 )
 @click.option(
     "-s",
     "--callback-script",
-    type=click.Path(exists=True),
+    type=click.Path(exists=True, executable=True),
     default=None,
     help=(
-        "The callback script to trigger after image is built. The callback script is called"
-        "with the first argument as the image ID."
+        "The executable callback script to trigger after image is built. The callback script is "
+        "called with the first argument as the image ID."
     ),
 )
 @click.option(
@@ -198,15 +224,11 @@ def _parse_url(
     default="",
     help=(
         "The GitHub runner version to install, e.g. 2.317.0. "
-        "See github.com/actions/runner/releases/."
+        "See github.com/actions/runner/releases/. "
         "Defaults to latest version."
     ),
 )
-@click.option(
-    "--experimental-external",
-    default=False,
-    help="EXPERIMENTAL: Use external Openstack builder to build images.",
-)
+@_experimental_external_option
 @click.option(
     "--flavor",
     default="",
@@ -233,12 +255,7 @@ def _parse_url(
     help="EXPERIMENTAL: OpenStack network to launch the external build run VMs under. "
     "Ignored if --experimental-external is not enabled",
 )
-@click.option(
-    "--prefix",
-    default="",
-    help="Name of the OpenStack resources to prefix with. Used to run the image builder in "
-    "parallel under same OpenStack project. Ignored if --experimental-external is not enabled",
-)
+@_prefix_option
 @click.option(
     "--proxy",
     default="",
@@ -249,8 +266,9 @@ def _parse_url(
     "--script-url",
     callback=_parse_url,
     default=None,
-    help="Run an external bash setup script fetched from the URL on the runners during cloud-init."
-    "Installation is run as root within the cloud-init script after the bare image default setup.",
+    help="Run an external bash setup script fetched from the URL on the runners during "
+    "cloud-init. Installation is run as root within the cloud-init script after the bare image "
+    "default setup.",
 )
 @click.option(
     "--upload-clouds",
@@ -265,9 +283,9 @@ def run(  # pylint: disable=too-many-arguments, too-many-locals, too-many-positi
     cloud_name: str,
     dockerhub_cache: urllib.parse.ParseResult | None,
     image_name: str,
-    base_image: str,
+    base_image: config.BaseImage,
     keep_revisions: int,
-    callback_script: Path | None,
+    callback_script: str | None,
     runner_version: str,
     experimental_external: bool,
     flavor: str,
@@ -301,8 +319,10 @@ def run(  # pylint: disable=too-many-arguments, too-many-locals, too-many-positi
         script_url: The external setup bash script URL.
         upload_clouds: The Openstack cloud to use to upload externally built image.
     """
+    # pylint: disable-next=import-outside-toplevel
+    from github_runner_image_builder import builder, openstack_builder
+
     arch = arch if arch else config.get_supported_arch()
-    base = config.BaseImage.from_str(base_image)
     if not experimental_external:
         click.echo(
             "[WARNING] Image builder via chroot will be deprecated in version 0.9.0.", err=True
@@ -311,7 +331,7 @@ def run(  # pylint: disable=too-many-arguments, too-many-locals, too-many-positi
             cloud_name=cloud_name,
             image_config=config.ImageConfig(
                 arch=arch,
-                base=base,
+                base=base_image,
                 microk8s=microk8s,
                 juju=juju,
                 runner_version=runner_version,
@@ -345,7 +365,7 @@ def run(  # pylint: disable=too-many-arguments, too-many-locals, too-many-positi
             ),
             image_config=config.ImageConfig(
                 arch=arch,
-                base=base,
+                base=base_image,
                 microk8s=microk8s,
                 juju=juju,
                 runner_version=runner_version,
@@ -359,8 +379,11 @@ def run(  # pylint: disable=too-many-arguments, too-many-locals, too-many-positi
         )
         click.echo(f"Image build success:\n{image_ids}", nl=False)
     if callback_script:
+        # The process is replaced by the callback script, flush the pending output first.
+        sys.stdout.flush()
+        sys.stderr.flush()
         # The callback script is a user trusted script.
-        subprocess.check_call([str(callback_script), image_ids])  # nosec: B603
+        os.execv(callback_script, [callback_script, image_ids])  # nosec: B606
 
 
 def _load_secrets() -> dict[str, str]:
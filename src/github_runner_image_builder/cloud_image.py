@@ -6,8 +6,10 @@
 # gzip needs to be preloaded to extract github runner tar.gz. This is because within the chroot
 # env, tarfile module tries to import gzip dynamically and fails.
 import gzip  # noqa: F401 # pylint: disable=unused-import
-import hashlib
+import http
+import json
 import logging
+import shutil
 import typing
 from pathlib import Path
 
@@ -15,13 +17,19 @@ import requests
 
 from github_runner_image_builder.config import Arch, BaseImage
 from github_runner_image_builder.errors import BaseImageDownloadError, UnsupportedArchitectureError
-from github_runner_image_builder.utils import retry
+from github_runner_image_builder.utils import get_file_digest, retry
 
 logger = logging.getLogger(__name__)
 
 SupportedBaseImageArch = typing.Literal["amd64", "arm64"]
 
-CHECKSUM_BUF_SIZE = 65536  # 65kb
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB chunks
+
+BASE_IMAGE_CACHE_DIR = Path.home() / ".cache/github-runner-image-builder/base-images"
+
+# Shared session to reuse the connection to cloud-images.ubuntu.com between the image and
+# SHA256SUMS downloads.
+_HTTP_SESSION = requests.Session()
 
 
 def download_and_validate_image(arch: Arch, base_image: BaseImage) -> Path:
@@ -53,6 +61,8 @@ def download_and_validate_image(arch: Arch, base_image: BaseImage) -> Path:
         raise BaseImageDownloadError("Corresponding checksum not found.")
     if not _validate_checksum(image_path, shasums[image_path_str]):
         logger.exception("Failed to validate SHASUM for cloud image (invalid checksum).")
+        # Force a full download on the next run instead of reusing a corrupt cached image.
+        _get_cache_meta_path(BASE_IMAGE_CACHE_DIR / image_path_str).unlink(missing_ok=True)
         raise BaseImageDownloadError("Invalid checksum.")
     return image_path
 
@@ -88,6 +98,10 @@ def _get_supported_runner_arch(arch: Arch) -> SupportedBaseImageArch:
 def _download_base_image(base_image: BaseImage, bin_arch: str, output_filename: str) -> Path:
     """Download the base image.
 
+    The image is cached in BASE_IMAGE_CACHE_DIR along with its ETag and Last-Modified headers.
+    A conditional request is sent on subsequent downloads and the cached image is reused if it
+    has not been modified upstream.
+
     Args:
         bin_arch: The ubuntu cloud-image supported arch.
         base_image: The ubuntu base image OS to download.
@@ -99,24 +113,93 @@ def _download_base_image(base_image: BaseImage, bin_arch: str, output_filename:
     Returns:
         The downloaded image path.
     """
+    BASE_IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    cached_image_path = BASE_IMAGE_CACHE_DIR / Path(output_filename).name
+    cache_meta_path = _get_cache_meta_path(cached_image_path)
     # The ubuntu-cloud-images is a trusted source
     # Bandit thinks there is no timeout provided for the code below.
     try:
-        request = requests.get(
+        response = _HTTP_SESSION.get(
             f"https://cloud-images.ubuntu.com/{base_image.value}/current/{base_image.value}"
             f"-server-cloudimg-{bin_arch}.img",
+            headers=_get_conditional_headers(
+                cached_image_path=cached_image_path, cache_meta_path=cache_meta_path
+            ),
             timeout=60 * 20,
             stream=True,
         )  # nosec: B310, B113
+        response.raise_for_status()
     except requests.exceptions.HTTPError as exc:
         logger.exception("Failed to download base cloud image.")
         raise BaseImageDownloadError from exc
-    with open(output_filename, "wb") as file:
-        for chunk in request.iter_content(1024 * 1024):  # 1 MB chunks
-            file.write(chunk)
+    if response.status_code == http.HTTPStatus.NOT_MODIFIED:
+        logger.info("Base image not modified, using cached image %s.", cached_image_path)
+        # Release the streamed connection back to the session pool.
+        response.close()
+    else:
+        # Invalidate the cache metadata first so that an interrupted download is never reused.
+        cache_meta_path.unlink(missing_ok=True)
+        partial_image_path = cached_image_path.with_name(f"{cached_image_path.name}.part")
+        try:
+            with open(partial_image_path, "wb") as file:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+        except BaseException:
+            # Do not leave the incomplete download behind.
+            partial_image_path.unlink(missing_ok=True)
+            raise
+        partial_image_path.replace(cached_image_path)
+        cache_meta_path.write_text(
+            json.dumps(
+                {
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                }
+            ),
+            encoding="utf-8",
+        )
+    # The image is modified in place during the build, copy it to keep the cached image pristine.
+    shutil.copyfile(cached_image_path, output_filename)
     return Path(output_filename)
 
 
+def _get_cache_meta_path(cached_image_path: Path) -> Path:
+    """Get the path to the cache metadata file of a cached image.
+
+    Args:
+        cached_image_path: The path to the cached image.
+
+    Returns:
+        The path to the cache metadata file.
+    """
+    return cached_image_path.with_name(f"{cached_image_path.name}.meta")
+
+
+def _get_conditional_headers(cached_image_path: Path, cache_meta_path: Path) -> dict[str, str]:
+    """Get the conditional request headers for the cached image.
+
+    Args:
+        cached_image_path: The path to the cached image.
+        cache_meta_path: The path to the cache metadata file.
+
+    Returns:
+        The If-None-Match/If-Modified-Since headers if a valid cached image exists.
+    """
+    if not cached_image_path.exists() or not cache_meta_path.exists():
+        return {}
+    try:
+        cache_meta = json.loads(cache_meta_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        logger.warning("Invalid base image cache metadata %s, ignoring.", cache_meta_path)
+        return {}
+    headers = {}
+    if etag := cache_meta.get("etag"):
+        headers["If-None-Match"] = etag
+    if last_modified := cache_meta.get("last_modified"):
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
 @retry(tries=3, delay=5, max_delay=30, backoff=2, local_logger=logger)
 def _fetch_shasums(base_image: BaseImage) -> dict[str, str]:
     """Fetch SHA256SUM for given base image.
@@ -133,7 +216,7 @@ def _fetch_shasums(base_image: BaseImage) -> dict[str, str]:
     """
     try:
         # bandit does not detect that the timeout parameter exists.
-        response = requests.get(  # nosec: request_without_timeout
+        response = _HTTP_SESSION.get(  # nosec: request_without_timeout
             f"https://cloud-images.ubuntu.com/{base_image.value}/current/SHA256SUMS",
             timeout=60 * 5,
         )
@@ -160,8 +243,4 @@ def _validate_checksum(file: Path, expected_checksum: str) -> bool:
     Returns:
         True if the checksums match. False otherwise.
     """
-    sha256 = hashlib.sha256()
-    with open(file=file, mode="rb") as target_file:
-        while data := target_file.read(CHECKSUM_BUF_SIZE):
-            sha256.update(data)
-    return sha256.hexdigest() == expected_checksum
+    return get_file_digest(path=file, algorithm="sha256") == expected_checksum
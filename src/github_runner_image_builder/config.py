@@ -31,17 +31,17 @@ class Arch(str, Enum):
 
         Returns:
             The architecture string.
-        """  # noqa: DCO050 the ValueError is an unreachable code.
-        match self:
-            case Arch.ARM64:
-                return "aarch64"
-            case Arch.X64:
-                return "x86_64"
-        raise ValueError  # pragma: nocover
+        """
+        return _OPENSTACK_ARCH_MAP[self]
+
 
+_OPENSTACK_ARCH_MAP = {Arch.ARM64: "aarch64", Arch.X64: "x86_64"}
 
 ARCHITECTURES_ARM64 = {"aarch64", "arm64"}
 ARCHITECTURES_X86 = {"x86_64"}
+_MACHINE_ARCH_MAP = {arch: Arch.ARM64 for arch in ARCHITECTURES_ARM64} | {
+    arch: Arch.X64 for arch in ARCHITECTURES_X86
+}
 
 
 def get_supported_arch() -> Arch:
@@ -54,13 +54,12 @@ def get_supported_arch() -> Arch:
         Arch: Current machine architecture.
     """
     arch = platform.machine()
-    match arch:
-        case arch if arch in ARCHITECTURES_ARM64:
-            return Arch.ARM64
-        case arch if arch in ARCHITECTURES_X86:
-            return Arch.X64
-        case _:
-            raise UnsupportedArchitectureError()
+    try:
+        return _MACHINE_ARCH_MAP[arch]
+    except KeyError as exc:
+        raise UnsupportedArchitectureError(
+            f"Detected system arch: {arch} is unsupported."
+        ) from exc
 
 
 class BaseImage(str, Enum):
@@ -97,21 +96,27 @@ class BaseImage(str, Enum):
         Args:
             tag_or_name: The base image string option.
 
+        Raises:
+            ValueError: If the base image is not supported.
+
         Returns:
             The base image configuration of the app.
         """
-        if tag_or_name in LTS_IMAGE_VERSION_TAG_MAP:
-            return cls(LTS_IMAGE_VERSION_TAG_MAP[tag_or_name])
-        return cls(tag_or_name)
+        try:
+            return _BASE_IMAGE_MAP[tag_or_name]
+        except KeyError as exc:
+            raise ValueError(f"{tag_or_name!r} is not a valid {cls.__name__}") from exc
 
 
 LTS_IMAGE_VERSION_TAG_MAP = {"22.04": BaseImage.JAMMY.value, "24.04": BaseImage.NOBLE.value}
-BASE_CHOICES = tuple(
-    itertools.chain.from_iterable((tag, name) for (tag, name) in LTS_IMAGE_VERSION_TAG_MAP.items())
-)
+# Resolves both the base image names and the LTS version tags.
+_BASE_IMAGE_MAP = {base.value: base for base in BaseImage} | {
+    tag: BaseImage(name) for tag, name in LTS_IMAGE_VERSION_TAG_MAP.items()
+}
+BASE_CHOICES = tuple(itertools.chain.from_iterable(LTS_IMAGE_VERSION_TAG_MAP.items()))
 IMAGE_OUTPUT_PATH = Path("compressed.img")
 
-IMAGE_DEFAULT_APT_PACKAGES = [
+IMAGE_DEFAULT_APT_PACKAGES = (
     "build-essential",
     "docker.io",
     "gh",
@@ -125,7 +130,7 @@ IMAGE_DEFAULT_APT_PACKAGES = [
     "time",
     "unzip",
     "wget",
-]
+)
 
 _LOG_LEVELS = (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR)
 LOG_LEVELS = tuple(
@@ -41,6 +41,10 @@ class ImageResizeError(BuildImageError):
     """Represents an error while resizing the image."""
 
 
+class OverlayImageError(BuildImageError):
+    """Represents an error while creating an overlay image on top of the stage1 image."""
+
+
 class ImageConnectError(BuildImageError):
     """Represents an error while connecting the image to network block device."""
 
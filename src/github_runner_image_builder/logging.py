@@ -18,13 +18,32 @@ def configure(log_level: str | int) -> None:
     Args:
         log_level: The logging verbosity level to apply.
     """
+    # basicConfig does nothing if the root logger is already configured, skip opening the log
+    # files in that case.
+    if logging.getLogger().handlers:
+        return
+    level = _normalize_log_level(log_level=log_level)
     LOG_FILE_DIR.mkdir(parents=True, exist_ok=True)
     # use regular file handlers because rotating within chroot environment may crash the program
     log_handler = logging.FileHandler(filename=LOG_FILE_PATH, encoding="utf-8")
-    log_handler.setLevel(log_level.upper() if isinstance(log_level, str) else log_level)
+    log_handler.setLevel(level)
     error_log_handler = logging.FileHandler(filename=ERROR_LOG_FILE_PATH, encoding="utf-8")
     logging.basicConfig(
-        level=log_level,
-        handlers=(log_handler, error_log_handler),
-        encoding="utf-8",
+        level=level,
+        # Keep logging to stderr as well, the file handlers are in addition to it.
+        handlers=(log_handler, error_log_handler, logging.StreamHandler()),
     )
+
+
+def _normalize_log_level(log_level: str | int) -> str | int:
+    """Normalize the log level into a value accepted by the logging module.
+
+    Args:
+        log_level: The log level name (case insensitive) or number, e.g. info, INFO, 20 or "20".
+
+    Returns:
+        The upper-case log level name or the log level number.
+    """
+    if isinstance(log_level, int):
+        return log_level
+    return int(log_level) if log_level.isdigit() else log_level.upper()
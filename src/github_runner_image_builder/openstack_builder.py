@@ -3,13 +3,23 @@
 
 """Module for interacting with external openstack VM image builder."""
 
+# The OpenStack builder steps, from resource setup to snapshot upload, are kept in this module.
+# pylint: disable=too-many-lines
+
 import base64
+import concurrent.futures
+import contextlib
 import dataclasses
+import fcntl
+import functools
 import hashlib
+import io
+import itertools
 import logging
+import os
 import pathlib
 import shutil
-import time
+import socket
 import typing
 import urllib
 import urllib.parse
@@ -38,9 +48,15 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import serialization
 
 import github_runner_image_builder.errors
-from github_runner_image_builder import cloud_image, config, store
+from github_runner_image_builder import cloud_image, config, store, utils
 from github_runner_image_builder.config import IMAGE_DEFAULT_APT_PACKAGES, Arch, BaseImage
 
+# Use the libyaml based parser when available.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
+
 logger = logging.getLogger(__name__)
 
 CLOUD_YAML_PATHS = (
@@ -50,10 +66,30 @@ CLOUD_YAML_PATHS = (
     pathlib.Path("/etc/openstack/clouds.yaml"),
 )
 
+BASE_IMAGE_NAME_FORMAT = "image-builder-base-{BASE}-{ARCH}"
+BUILDER_SERVER_NAME_FORMAT = "{PREFIX}-image-builder-{BASE}-{ARCH}"
+
 BUILDER_KEY_PATH = pathlib.Path("/home/ubuntu/.ssh/builder_key")
+BUILDER_KEY_LOCK_PATH = pathlib.Path("/home/ubuntu/.ssh/builder_key.lock")
 SHARED_SECURITY_GROUP_NAME = "github-runner-image-builder-v1"
+SHARED_SECURITY_GROUP_RULES: tuple[dict[str, typing.Any], ...] = (
+    {"protocol": "icmp", "direction": "ingress", "ethertype": "IPv4"},
+    {
+        "port_range_min": 22,
+        "port_range_max": 22,
+        "protocol": "tcp",
+        "direction": "ingress",
+        "ethertype": "IPv4",
+    },
+)
 
 CREATE_SERVER_TIMEOUT = 5 * 60  # seconds
+CLOUD_INIT_WAIT_TIMEOUT = 30 * 60  # seconds
+SSH_KEEPALIVE_INTERVAL = 30  # seconds
+SSH_PORT = 22
+SSH_PROBE_TIMEOUT = 2  # seconds
+SNAPSHOT_WAIT_TIMEOUT = 10 * 60  # seconds
+SNAPSHOT_STREAM_BUFFER_SIZE = 8 * 1024 * 1024  # 8 MB
 
 MIN_CPU = 2
 MIN_RAM = 1024  # M
@@ -63,6 +99,8 @@ MIN_DISK = 20  # G
 def determine_cloud(cloud_name: str | None = None) -> str:
     """Automatically determine cloud to use from clouds.yaml by selecting the first cloud.
 
+    The OS_CLOUD environment variable takes precedence over clouds.yaml if set.
+
     Args:
         cloud_name: str
 
@@ -75,9 +113,14 @@ def determine_cloud(cloud_name: str | None = None) -> str:
     # The cloud credentials may be stored in environment variable, trust user input if given.
     if cloud_name:
         return cloud_name
+    # The cloud selected through the OpenStack environment variable does not need clouds.yaml.
+    if env_cloud_name := os.environ.get("OS_CLOUD"):
+        return env_cloud_name
     logger.info("Determning cloud to use.")
     try:
-        clouds_yaml_path = next(path for path in CLOUD_YAML_PATHS if path.exists())
+        clouds_yaml_path = next(
+            path for path in (path.expanduser() for path in CLOUD_YAML_PATHS) if path.exists()
+        )
     except StopIteration as exc:
         logger.exception("Unable to determine cloud to use from clouds.yaml files.")
         raise github_runner_image_builder.errors.CloudsYAMLError(
@@ -85,7 +128,7 @@ def determine_cloud(cloud_name: str | None = None) -> str:
             "Please check that clouds.yaml exists."
         ) from exc
     try:
-        clouds_yaml = yaml.safe_load(clouds_yaml_path.read_text(encoding="utf-8"))
+        clouds_yaml = yaml.load(clouds_yaml_path.read_text(encoding="utf-8"), Loader=SafeLoader)
         cloud: str = list(clouds_yaml["clouds"].keys())[0]
     except (TypeError, yaml.error.YAMLError, KeyError, IndexError) as exc:
         logger.exception("Invalid clouds.yaml contents.")
@@ -106,35 +149,73 @@ def initialize(arch: Arch, cloud_name: str, prefix: str) -> None:
         prefix: The prefix to use for OpenStack resource names.
     """
     logger.info("Initializing external builder.")
-    logger.info("Downloading Jammy image.")
-    jammy_image_path = cloud_image.download_and_validate_image(
-        arch=arch, base_image=BaseImage.JAMMY
-    )
-    logger.info("Downloading Noble image.")
-    noble_image_path = cloud_image.download_and_validate_image(
-        arch=arch, base_image=BaseImage.NOBLE
-    )
-    logger.info("Uploading Jammy image.")
-    store.upload_image(
-        arch=arch,
-        cloud_name=cloud_name,
-        image_name=_get_base_image_name(arch=arch, base=BaseImage.JAMMY),
-        image_path=jammy_image_path,
-        keep_revisions=1,
-    )
-    logger.info("Uploading Noble image.")
+    with openstack.connect(cloud=cloud_name) as conn:
+        # The base images are independent of each other, seed them concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(BaseImage)) as executor:
+            futures = [
+                executor.submit(
+                    _seed_base_image, arch=arch, base=base, cloud_name=cloud_name, conn=conn
+                )
+                for base in BaseImage
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        _create_keypair(conn=conn, prefix=prefix)
+        logger.info("Creating security group %s.", SHARED_SECURITY_GROUP_NAME)
+        _create_security_group(conn=conn)
+
+
+def _seed_base_image(
+    arch: Arch, base: BaseImage, cloud_name: str, conn: openstack.connection.Connection
+) -> None:
+    """Download the ubuntu base image and upload it to OpenStack to use as builder base.
+
+    Args:
+        arch: The architecture of the image to seed.
+        base: The ubuntu base image to seed.
+        cloud_name: The cloud to use from the clouds.yaml file.
+        conn: The OpenStack connection instance.
+    """
+    logger.info("Downloading %s image.", base.value)
+    image_path = cloud_image.download_and_validate_image(arch=arch, base_image=base)
+    image_name = _get_base_image_name(arch=arch, base=base)
+    if _is_image_up_to_date(
+        image=store.get_latest_image(connection=conn, image_name=image_name),
+        image_path=image_path,
+    ):
+        logger.info("Base %s image is up to date, skipping upload.", base.value)
+        return
+    logger.info("Uploading %s image.", base.value)
     store.upload_image(
         arch=arch,
         cloud_name=cloud_name,
-        image_name=_get_base_image_name(arch=arch, base=BaseImage.NOBLE),
-        image_path=noble_image_path,
+        image_name=image_name,
+        image_path=image_path,
         keep_revisions=1,
+        connection=conn,
     )
 
-    with openstack.connect(cloud=cloud_name) as conn:
-        _create_keypair(conn=conn, prefix=prefix)
-        logger.info("Creating security group %s.", SHARED_SECURITY_GROUP_NAME)
-        _create_security_group(conn=conn)
+
+def _is_image_up_to_date(
+    image: openstack.image.v2.image.Image | None, image_path: pathlib.Path
+) -> bool:
+    """Check whether the uploaded image has the same contents as the local image.
+
+    Args:
+        image: The uploaded OpenStack image.
+        image_path: The path to the local image.
+
+    Returns:
+        True if the image hash computed by Glance matches the local image, False otherwise.
+    """
+    if not image or not image.hash_algo or not image.hash_value:
+        return False
+    try:
+        image_hash = utils.get_file_digest(path=image_path, algorithm=image.hash_algo)
+    except ValueError:
+        logger.warning("Unsupported image hash algorithm %s.", image.hash_algo)
+        return False
+    return image_hash == image.hash_value
 
 
 def _get_base_image_name(arch: Arch, base: BaseImage) -> str:
@@ -147,28 +228,47 @@ def _get_base_image_name(arch: Arch, base: BaseImage) -> str:
     Returns:
         The ubuntu base image name uploaded to OpenStack.
     """
-    return f"image-builder-base-{base.value}-{arch.value}"
+    return BASE_IMAGE_NAME_FORMAT.format(BASE=base.value, ARCH=arch.value)
 
 
 def _create_keypair(conn: openstack.connection.Connection, prefix: str) -> None:
     """Create an SSH Keypair to ssh into builder instance.
 
+    The keypair is (re)generated under a file lock so that parallel image builder processes do
+    not overwrite each other's private key.
+
     Args:
         conn: The Openstach connection instance.
         prefix: The prefix to use for OpenStack resource names.
     """
     key_name = _get_keypair_name(prefix=prefix)
-    key = conn.get_keypair(name_or_id=key_name)
-    if key and BUILDER_KEY_PATH.exists():
-        return
-    logger.info("Deleting existing keypair (to regenerate) %s.", key_name)
-    conn.delete_keypair(name=key_name)
-    logger.info("Creating keypair %s.", key_name)
-    keypair = conn.create_keypair(name=key_name)
-    # OpenStack library does not provide correct type hints for keys.
-    BUILDER_KEY_PATH.write_text(keypair.private_key, encoding="utf-8")  # type: ignore
-    shutil.chown(BUILDER_KEY_PATH, user="ubuntu", group="ubuntu")
-    BUILDER_KEY_PATH.chmod(0o400)
+    with _file_lock(BUILDER_KEY_LOCK_PATH):
+        key = conn.compute.find_keypair(key_name, ignore_missing=True)
+        if _is_keypair_in_sync(key=key):
+            return
+        logger.info("Deleting existing keypair (to regenerate) %s.", key_name)
+        conn.delete_keypair(name=key_name)
+        logger.info("Creating keypair %s.", key_name)
+        keypair = conn.create_keypair(name=key_name)
+        # OpenStack library does not provide correct type hints for keys.
+        BUILDER_KEY_PATH.write_text(keypair.private_key, encoding="utf-8")  # type: ignore
+        shutil.chown(BUILDER_KEY_PATH, user="ubuntu", group="ubuntu")
+        BUILDER_KEY_PATH.chmod(0o400)
+
+
+@contextlib.contextmanager
+def _file_lock(path: pathlib.Path) -> typing.Iterator[None]:
+    """Hold an exclusive lock on a file for the duration of the context.
+
+    Args:
+        path: The path to the lock file.
+    """
+    with open(path, "a", encoding="utf-8") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 def _get_keypair_name(prefix: str) -> str:
@@ -186,29 +286,61 @@ def _get_keypair_name(prefix: str) -> str:
 def _create_security_group(conn: openstack.connection.Connection) -> None:
     """Create a security group for builder instances.
 
+    Neutron does not enforce unique security group names, so parallel image builder runs may each
+    create the security group. All runs keep the oldest one and delete the rest.
+
     Args:
         conn: The Openstach connection instance.
     """
-    if conn.get_security_group(name_or_id=SHARED_SECURITY_GROUP_NAME):
-        return
-    conn.create_security_group(
-        name=SHARED_SECURITY_GROUP_NAME,
-        description="For builders managed by the github-runner-image-builder.",
-    )
-    conn.create_security_group_rule(
-        secgroup_name_or_id=SHARED_SECURITY_GROUP_NAME,
-        protocol="icmp",
-        direction="ingress",
-        ethertype="IPv4",
-    )
-    conn.create_security_group_rule(
-        secgroup_name_or_id=SHARED_SECURITY_GROUP_NAME,
-        port_range_min="22",
-        port_range_max="22",
-        protocol="tcp",
-        direction="ingress",
-        ethertype="IPv4",
+    security_groups = list(conn.network.security_groups(name=SHARED_SECURITY_GROUP_NAME))
+    if not security_groups:
+        conn.network.create_security_group(
+            name=SHARED_SECURITY_GROUP_NAME,
+            description="For builders managed by the github-runner-image-builder.",
+        )
+        security_groups = list(conn.network.security_groups(name=SHARED_SECURITY_GROUP_NAME))
+    security_group, *duplicates = sorted(
+        security_groups, key=lambda group: (group.created_at, group.id)
     )
+    for duplicate in duplicates:
+        logger.info("Deleting duplicate security group %s.", duplicate.id)
+        conn.delete_security_group(name_or_id=duplicate.id)
+    security_group_id = security_group.id
+    existing_rules = {
+        (rule.protocol, rule.port_range_min, rule.direction)
+        for rule in conn.network.security_group_rules(security_group_id=security_group_id)
+    }
+    missing_rules = [
+        rule
+        for rule in SHARED_SECURITY_GROUP_RULES
+        if (rule["protocol"], rule.get("port_range_min"), rule["direction"]) not in existing_rules
+    ]
+    if not missing_rules:
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(missing_rules)) as executor:
+        # Consume the results to raise any error from the rule creation.
+        list(
+            executor.map(
+                functools.partial(_create_security_group_rule, conn, security_group_id),
+                missing_rules,
+            )
+        )
+
+
+def _create_security_group_rule(
+    conn: openstack.connection.Connection, security_group_id: str, rule: dict[str, typing.Any]
+) -> None:
+    """Create a security group rule, tolerating a rule created concurrently.
+
+    Args:
+        conn: The Openstach connection instance.
+        security_group_id: The ID of the security group to create the rule in.
+        rule: The security group rule arguments.
+    """
+    try:
+        conn.create_security_group_rule(secgroup_name_or_id=security_group_id, **rule)
+    except openstack.exceptions.ConflictException:
+        logger.info("Security group rule %s already created.", rule)
 
 
 @dataclasses.dataclass
@@ -279,9 +411,9 @@ def run(
             security_groups=[SHARED_SECURITY_GROUP_NAME],
             userdata=cloud_init_script,
             auto_ip=False,
-            timeout=CREATE_SERVER_TIMEOUT,
-            wait=True,
+            wait=False,
         )
+        builder = _wait_for_server_active(conn=conn, server=builder)
         logger.info("Launched builder, waiting for cloud-init to complete: %s.", builder.id)
         _wait_for_cloud_init_complete(conn=conn, server=builder, ssh_key=BUILDER_KEY_PATH)
         log_output = conn.get_server_console(server=builder)
@@ -291,6 +423,7 @@ def run(
             image_name=image_config.name,
             server=builder,
             keep_revisions=keep_revisions,
+            connection=conn,
         )
         logger.info(
             "Requested snapshot, waiting for snapshot to complete: %s, %s.", builder.id, image.id
@@ -299,6 +432,7 @@ def run(
         images = _upload_to_clouds(
             conn=conn,
             image=image,
+            cloud_name=cloud_config.cloud_name,
             upload_cloud_names=cloud_config.upload_cloud_names,
             upload_cloud_config=_UploadCloudConfig(
                 arch=image_config.arch,
@@ -327,17 +461,11 @@ def _prepare_openstack_resources(
         key_name: The OpenStack key name used to connect to the builder VM.
         prefix: The OpenStack resource prefix.
     """
-    # OpenStack library does not provide good type hinting
-    key: openstack.compute.v2.keypair.Keypair | None = conn.get_keypair(
-        name_or_id=key_name
-    )  # type: ignore
-    # Check fingerprint since the key may have diverged due to unforeseen circumstances.
-    if not key or key.fingerprint != _get_key_fingerprint():
+    key = conn.compute.find_keypair(key_name, ignore_missing=True)
+    if not _is_keypair_in_sync(key=key):
         _create_keypair(conn=conn, prefix=prefix)
 
-    security_groups: list[openstack.network.v2.security_group.SecurityGroup] = (
-        conn.search_security_groups(name_or_id=SHARED_SECURITY_GROUP_NAME)
-    )
+    security_groups = list(conn.network.security_groups(name=SHARED_SECURITY_GROUP_NAME))
     if len(security_groups) != 1:
         for security_group in security_groups:
             conn.delete_security_group(name_or_id=security_group.id)
@@ -351,6 +479,19 @@ def _prepare_openstack_resources(
             conn.delete_server(name_or_id=server.id)
 
 
+def _is_keypair_in_sync(key: openstack.compute.v2.keypair.Keypair | None) -> bool:
+    """Check whether the OpenStack keypair matches the local SSH key.
+
+    Args:
+        key: The OpenStack keypair, if it exists.
+
+    Returns:
+        True if the keypair and the local SSH key exist and the fingerprints match.
+    """
+    # Check fingerprint since the key may have diverged due to unforeseen circumstances.
+    return bool(key and BUILDER_KEY_PATH.exists() and key.fingerprint == _get_key_fingerprint())
+
+
 def _get_key_fingerprint() -> str:
     """Get the MD5 fingerprint of the ssh key.
 
@@ -412,8 +553,11 @@ def _determine_flavor(conn: openstack.connection.Connection, flavor_name: str |
             )
         # OpenStack library does not provide correct type hints for flavors.
         return flavor.id  # type: ignore
-    flavors: list[openstack.compute.v2.flavor.Flavor] = conn.list_flavors()
-    flavors = sorted(flavors, key=lambda flavor: (flavor.vcpus, flavor.ram, flavor.disk))
+    flavors: list[openstack.compute.v2.flavor.Flavor] = sorted(
+        # Nova filters the flavors by the minimum RAM and disk, CPUs are checked below.
+        conn.compute.flavors(details=True, min_ram=MIN_RAM, min_disk=MIN_DISK),
+        key=lambda flavor: (flavor.vcpus, flavor.ram, flavor.disk),
+    )
     for flavor in flavors:
         # OpenStack library does not provide correct type hints for flavors.
         if (
@@ -465,6 +609,20 @@ def _determine_network(conn: openstack.connection.Connection, network_name: str
     raise github_runner_image_builder.errors.NetworkNotFoundError("No suitable network found.")
 
 
+def _get_cloud_init_template() -> jinja2.Template:
+    """Load and compile the cloud-init script template.
+
+    Returns:
+        The compiled cloud-init script template.
+    """
+    env = jinja2.Environment(
+        loader=jinja2.PackageLoader("github_runner_image_builder", "templates"),
+        autoescape=jinja2.select_autoescape(),
+        auto_reload=False,
+    )
+    return env.get_template("cloud-init.sh.j2")
+
+
 def _generate_cloud_init_script(
     image_config: config.ImageConfig,
     proxy: str,
@@ -480,12 +638,7 @@ def _generate_cloud_init_script(
     Returns:
         The cloud-init script to create snapshot image.
     """
-    env = jinja2.Environment(
-        loader=jinja2.PackageLoader("github_runner_image_builder", "templates"),
-        autoescape=jinja2.select_autoescape(),
-    )
-    template = env.get_template("cloud-init.sh.j2")
-    return template.render(
+    return _get_cloud_init_template().render(
         PROXY_URL=proxy,
         DOCKERHUB_CACHE_URL=dockerhub_cache.geturl() if dockerhub_cache else "",
         DOCKERHUB_CACHE_HOST=dockerhub_cache.hostname if dockerhub_cache else "",
@@ -526,15 +679,91 @@ def _get_builder_name(arch: Arch, base: BaseImage, prefix: str) -> str:
     Returns:
         The builder VM name launched on OpenStack.
     """
-    return f"{prefix}-image-builder-{base.value}-{arch.value}"
+    return BUILDER_SERVER_NAME_FORMAT.format(PREFIX=prefix, BASE=base.value, ARCH=arch.value)
+
+
+def _is_falsy(result: object) -> bool:
+    """Check whether a polled result is falsy, for tenacity to retry on.
+
+    Args:
+        result: The result returned by the polled function.
+
+    Returns:
+        Whether the result is falsy.
+    """
+    return not result
+
+
+def _is_none(result: object) -> bool:
+    """Check whether a polled result is None, for tenacity to retry on.
+
+    Args:
+        result: The result returned by the polled function.
+
+    Returns:
+        Whether the result is None.
+    """
+    return result is None
+
+
+def _wait_for_server_active(
+    conn: openstack.connection.Connection, server: openstack.compute.v2.server.Server
+) -> openstack.compute.v2.server.Server:
+    """Wait until the server has been launched and is active.
+
+    Args:
+        conn: The Openstach connection instance.
+        server: The OpenStack server to wait for.
+
+    Raises:
+        TimeoutError: if the server took too long to become active.
+
+    Returns:
+        The active OpenStack server.
+    """
+    try:
+        # The poll is retried until the server is returned.
+        return typing.cast(
+            openstack.compute.v2.server.Server, _poll_server_active(conn=conn, server=server)
+        )
+    except tenacity.RetryError as exc:
+        logger.error("Timed out waiting for server to be active, %s.", server.name)
+        raise TimeoutError(f"Timed out waiting for server to be active, {server.id}.") from exc
 
 
 @tenacity.retry(
-    wait=tenacity.wait_exponential(multiplier=2, max=30),
-    # retry if False is returned
-    retry=tenacity.retry_if_result(lambda result: not result),
-    reraise=True,
+    wait=tenacity.wait_exponential(multiplier=2, max=15),
+    stop=tenacity.stop_after_delay(CREATE_SERVER_TIMEOUT),
+    retry=tenacity.retry_if_result(_is_none),
 )
+def _poll_server_active(
+    conn: openstack.connection.Connection, server: openstack.compute.v2.server.Server
+) -> openstack.compute.v2.server.Server | None:
+    """Poll whether the server is active.
+
+    Args:
+        conn: The Openstach connection instance.
+        server: The OpenStack server to check is active.
+
+    Raises:
+        OpenstackError: if the server failed to launch.
+
+    Returns:
+        The server if it is active, None otherwise. Used for tenacity retry to pick up return \
+            value.
+    """
+    current_server = conn.compute.get_server(server.id)
+    if current_server.status == "ACTIVE":
+        return current_server
+    if current_server.status == "ERROR":
+        logger.error("Server failed to launch, %s: %s.", server.name, current_server.fault)
+        raise github_runner_image_builder.errors.OpenstackError(
+            f"Server failed to launch, {server.id}: {current_server.fault}"
+        )
+    logger.info("Server not yet active, waiting..., name: %s, id: %s", server.name, server.id)
+    return None
+
+
 def _wait_for_cloud_init_complete(
     conn: openstack.connection.Connection,
     server: openstack.compute.v2.server.Server,
@@ -542,22 +771,65 @@ def _wait_for_cloud_init_complete(
 ) -> bool:
     """Wait until the userdata has finished installing expected components.
 
+    A single SSH connection is established and reused for every cloud-init status poll.
+
     Args:
         conn: The Openstach connection instance.
         server: The OpenStack server instance to check if cloud_init is complete.
         ssh_key: The key to SSH RSA key to connect to the OpenStack server instance.
 
+    Raises:
+        TimeoutError: if cloud-init took too long to complete.
+
+    Returns:
+        Whether the cloud init is complete.
+    """
+    ssh_connection = _get_ssh_connection(conn=conn, server=server, ssh_key=ssh_key)
+    # cloud-init status --wait produces no output for long periods, keep the connection alive.
+    ssh_connection.transport.set_keepalive(SSH_KEEPALIVE_INTERVAL)
+    with ssh_connection:
+        try:
+            return _poll_cloud_init_complete(
+                conn=conn, server=server, ssh_connection=ssh_connection
+            )
+        except tenacity.RetryError as exc:
+            logger.error("Timed out waiting for cloud-init to complete, %s.", server.name)
+            raise TimeoutError(
+                f"Timed out waiting for cloud-init to complete, {server.id}."
+            ) from exc
+
+
+@tenacity.retry(
+    wait=tenacity.wait_exponential(multiplier=2, max=30),
+    stop=tenacity.stop_after_delay(CLOUD_INIT_WAIT_TIMEOUT),
+    retry=tenacity.retry_if_result(_is_falsy),
+)
+def _poll_cloud_init_complete(
+    conn: openstack.connection.Connection,
+    server: openstack.compute.v2.server.Server,
+    ssh_connection: fabric.Connection,
+) -> bool:
+    """Poll the cloud-init status until it is complete.
+
+    Args:
+        conn: The Openstach connection instance.
+        server: The OpenStack server instance to check if cloud_init is complete.
+        ssh_connection: The SSH connection to the OpenStack server instance.
+
     Raises:
         CloudInitFailError: if there was an error running cloud-init status command.
+        TimeoutError: if the cloud-init status command timed out.
 
     Returns:
         Whether the cloud init is complete. Used for tenacity retry to pick up return value.
     """
-    ssh_connection = _get_ssh_connection(conn=conn, server=server, ssh_key=ssh_key)
     try:
         result: fabric.Result | None = ssh_connection.run(
-            "cloud-init status --wait", timeout=60 * 30
+            "cloud-init status --wait", timeout=CLOUD_INIT_WAIT_TIMEOUT
         )
+    except invoke.exceptions.CommandTimedOut as exc:
+        logger.error("Timed out waiting for cloud-init to complete, %s.", server.name)
+        raise TimeoutError(f"Timed out waiting for cloud-init to complete, {server.id}.") from exc
     except invoke.exceptions.UnexpectedExit as exc:
         log_out = conn.get_server_console(server=server)
         logger.error("Cloud init output: %s", log_out)
@@ -580,7 +852,8 @@ def _get_ssh_connection(
 
     Args:
         conn: The Openstach connection instance.
-        server: The OpenStack server instance to check if cloud_init is complete.
+        server: The OpenStack server instance to connect to. Its addresses are refreshed only if \
+            they are not populated yet.
         ssh_key: The key to SSH RSA key to connect to the OpenStack server instance.
 
     Raises:
@@ -589,50 +862,52 @@ def _get_ssh_connection(
     Returns:
         The SSH Connection instance.
     """
-    # OpenStack library does not provide correct type hints for it.
-    server = conn.get_server(name_or_id=server.id)  # type: ignore
-    network_address_list = server.addresses.values()  # type: ignore
-    if not network_address_list:
+    if not server.addresses:
+        logger.info("Refreshing server addresses, %s.", server.name)
+        server = conn.compute.get_server(server.id)
+    server_addresses: list[str] = [
+        address["addr"]
+        # OpenStack library does not provide correct type hints for it.
+        for address in itertools.chain.from_iterable(server.addresses.values())  # type: ignore
+    ]
+    if not server_addresses:
         logger.error("Server address not found, %s.", server.name)
         raise github_runner_image_builder.errors.AddressNotFoundError(
             f"No addresses found for OpenStack server {server.name}"
         )
 
-    server_addresses: list[str] = [
-        address["addr"]
-        for network_addresses in network_address_list
-        for address in network_addresses
-    ]
-    for ip in server_addresses:
-        try:
+    # Only attempt the SSH handshake on the addresses that accept a TCP connection. The addresses
+    # are tried as soon as their probe completes, the executor is shut down without waiting since
+    # the remaining probes time out on their own.
+    executor = concurrent.futures.ThreadPoolExecutor(  # pylint: disable=consider-using-with
+        max_workers=len(server_addresses)
+    )
+    try:
+        for ip, is_open in zip(
+            server_addresses, executor.map(_is_ssh_port_open, server_addresses)
+        ):
+            if not is_open:
+                continue
             connection = fabric.Connection(
                 host=ip,
                 user="ubuntu",
                 connect_kwargs={"key_filename": str(ssh_key)},
                 connect_timeout=30,
             )
-            result: fabric.Result | None = connection.run(
-                "echo hello world", warn=True, timeout=30
-            )
-            if not result or not result.ok:
+            try:
+                connection.open()
+            except (
+                paramiko.ssh_exception.NoValidConnectionsError,
+                TimeoutError,
+                paramiko.ssh_exception.SSHException,
+            ):
                 logger.warning(
-                    "SSH test connection failed, server: %s, address: %s", server.name, ip
+                    "Unable to SSH into %s with address %s", server.name, ip, exc_info=True
                 )
                 continue
-            if "hello world" in result.stdout:
-                return connection
-        except (
-            paramiko.ssh_exception.NoValidConnectionsError,
-            TimeoutError,
-            paramiko.ssh_exception.SSHException,
-        ):
-            logger.warning(
-                "Unable to SSH into %s with address %s",
-                server.name,
-                connection.host,
-                exc_info=True,
-            )
-            continue
+            return connection
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     logger.error("Server SSH address not found, %s.", server.name)
     raise github_runner_image_builder.errors.AddressNotFoundError(
         f"No connectable SSH addresses found, server: {server.name}, "
@@ -640,6 +915,23 @@ def _get_ssh_connection(
     )
 
 
+def _is_ssh_port_open(ip: str) -> bool:
+    """Check whether the SSH port of an address accepts TCP connections.
+
+    Args:
+        ip: The address to check.
+
+    Returns:
+        True if the SSH port accepted the connection. False otherwise.
+    """
+    try:
+        with socket.create_connection((ip, SSH_PORT), timeout=SSH_PROBE_TIMEOUT):
+            return True
+    except OSError:
+        logger.debug("SSH port not open on address %s.", ip)
+        return False
+
+
 def _wait_for_snapshot_complete(
     conn: openstack.connection.Connection, image: openstack.image.v2.image.Image
 ) -> None:
@@ -652,20 +944,45 @@ def _wait_for_snapshot_complete(
     Raises:
         TimeoutError: if the image snapshot took too long to complete.
     """
-    for _ in range(10):
-        # OpenStack library does not provide correct type hints for it.
-        image = conn.get_image(name_or_id=image.id)  # type: ignore
-        if image.status == "active":
-            return
-        logger.info(
-            "Image snapshot not yet active, waiting..., name: %s, id: %s", image.name, image.id
-        )
-        time.sleep(60)
-    # OpenStack library does not provide correct type hints for it.
-    image = conn.get_image(name_or_id=image.id)  # type: ignore
-    if not image or not image.status == "active":
+    try:
+        _poll_snapshot_active(conn=conn, image=image)
+    except tenacity.RetryError as exc:
         logger.error("Timed out waiting for snapshot to be active, %s.", image.name)
-        raise TimeoutError(f"Timed out waiting for snapshot to be active, {image.id}.")
+        raise TimeoutError(f"Timed out waiting for snapshot to be active, {image.id}.") from exc
+
+
+@tenacity.retry(
+    wait=tenacity.wait_exponential_jitter(initial=2, max=60, jitter=5),
+    stop=tenacity.stop_after_delay(SNAPSHOT_WAIT_TIMEOUT),
+    retry=tenacity.retry_if_result(_is_falsy),
+)
+def _poll_snapshot_active(
+    conn: openstack.connection.Connection, image: openstack.image.v2.image.Image
+) -> bool:
+    """Poll whether the snapshot image is active.
+
+    Args:
+        conn: The Openstach connection instance.
+        image: The OpenStack server snapshot image to check is active.
+
+    Raises:
+        OpenstackError: if the snapshot image failed to be created.
+
+    Returns:
+        Whether the snapshot image is active. Used for tenacity retry to pick up return value.
+    """
+    current_image = conn.image.get_image(image.id)
+    if current_image.status == "active":
+        return True
+    if current_image.status in ("killed", "deleted"):
+        logger.error("Image snapshot failed, %s: %s.", image.name, current_image.status)
+        raise github_runner_image_builder.errors.OpenstackError(
+            f"Image snapshot failed, {image.id}: {current_image.status}"
+        )
+    logger.info(
+        "Image snapshot not yet active, waiting..., name: %s, id: %s", image.name, image.id
+    )
+    return False
 
 
 @dataclasses.dataclass
@@ -686,14 +1003,19 @@ class _UploadCloudConfig:
 def _upload_to_clouds(
     conn: openstack.connection.Connection,
     image: openstack.image.v2.image.Image,
+    cloud_name: str,
     upload_cloud_names: typing.Iterable[str] | None,
     upload_cloud_config: _UploadCloudConfig,
 ) -> tuple[openstack.image.v2.image.Image, ...]:
     """Upload the snapshot image to different clouds.
 
+    The snapshot is streamed from the source cloud into each upload without being staged on disk.
+    The snapshot itself is used for the source cloud, without being transferred again.
+
     Args:
         conn: The OpenStack connection instance.
         image: The snapshot image to upload.
+        cloud_name: The source cloud the snapshot was created on.
         upload_cloud_names: The clouds to upload the image to.
         upload_cloud_config: The upload image configuration.
 
@@ -702,24 +1024,128 @@ def _upload_to_clouds(
     """
     if not upload_cloud_names:
         return (image,)
-    file_path = pathlib.Path(f"{image.name}.snapshot")
-    logger.info("Downloading snapshot to %s.", file_path)
-    conn.download_image(name_or_id=image.id, output_file=file_path, stream=True)
     images: list[openstack.image.v2.image.Image] = []
-    for cloud_name in upload_cloud_names:
-        logger.info("Uploading downloaded snapshot to %s.", cloud_name)
-        image = store.upload_image(
-            arch=upload_cloud_config.arch,
-            cloud_name=cloud_name,
-            image_name=upload_cloud_config.image_name,
-            image_path=file_path,
-            keep_revisions=upload_cloud_config.keep_revisions,
+    for upload_cloud_name in upload_cloud_names:
+        if upload_cloud_name == cloud_name:
+            logger.info("Using snapshot %s on source cloud %s.", image.id, cloud_name)
+            images.append(image)
+            continue
+        logger.info("Streaming snapshot %s to %s.", image.id, upload_cloud_name)
+        uploaded_image = _stream_snapshot(
+            conn=conn,
+            image=image,
+            cloud_name=upload_cloud_name,
+            upload_cloud_config=upload_cloud_config,
         )
-        images.append(image)
+        images.append(uploaded_image)
         logger.info(
             "Uploaded snapshot on cloud %s, id: %s, name: %s",
-            cloud_name,
-            image.id,
-            image.name,
+            upload_cloud_name,
+            uploaded_image.id,
+            uploaded_image.name,
         )
     return tuple(images)
+
+
+def _stream_snapshot(
+    conn: openstack.connection.Connection,
+    image: openstack.image.v2.image.Image,
+    cloud_name: str,
+    upload_cloud_config: _UploadCloudConfig,
+) -> openstack.image.v2.image.Image:
+    """Stream the snapshot image download into an upload to another cloud through a pipe.
+
+    Args:
+        conn: The OpenStack connection instance.
+        image: The snapshot image to upload.
+        cloud_name: The cloud to upload the image to.
+        upload_cloud_config: The upload image configuration.
+
+    Returns:
+        The uploaded cloud image.
+    """
+    read_fd, write_fd = os.pipe()
+    # Both ends are closed on exit in case they were not closed by the download or the stream,
+    # e.g. if the download could not be submitted. Closing an already closed end is a no-op.
+    with io.FileIO(read_fd, "rb") as reader, io.FileIO(write_fd, "wb") as raw_writer:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            download = executor.submit(_download_snapshot, conn, image, raw_writer)
+            # The read end is closed before waiting on the download so that a failed upload
+            # unblocks the download with a broken pipe.
+            with _SnapshotStream(reader=reader, download=download) as stream:
+                uploaded_image = store.upload_image_data(
+                    arch=upload_cloud_config.arch,
+                    cloud_name=cloud_name,
+                    image_name=upload_cloud_config.image_name,
+                    image_data=typing.cast(typing.BinaryIO, stream),
+                    disk_format=image.disk_format,
+                    keep_revisions=upload_cloud_config.keep_revisions,
+                )
+    return uploaded_image
+
+
+def _download_snapshot(
+    conn: openstack.connection.Connection,
+    image: openstack.image.v2.image.Image,
+    raw_writer: io.FileIO,
+) -> None:
+    """Download the snapshot image into the write end of a pipe.
+
+    Args:
+        conn: The OpenStack connection instance.
+        image: The snapshot image to download.
+        raw_writer: The write end of the pipe, closed once the download ends.
+    """
+    with io.BufferedWriter(raw_writer, buffer_size=SNAPSHOT_STREAM_BUFFER_SIZE) as writer:
+        conn.download_image(name_or_id=image.id, output_file=writer, stream=True)
+
+
+class _SnapshotStream(io.RawIOBase):
+    """The read end of a snapshot download pipe.
+
+    Reaching the end of the pipe raises the download error, if any, so that a failed download is
+    never uploaded as a truncated image.
+
+    Attributes:
+        reader: The read end of the pipe.
+        download: The download writing into the pipe.
+    """
+
+    def __init__(self, reader: io.FileIO, download: concurrent.futures.Future[None]):
+        """Initialize the snapshot stream.
+
+        Args:
+            reader: The read end of the pipe.
+            download: The download writing into the pipe.
+        """
+        super().__init__()
+        self.reader = reader
+        self.download = download
+
+    def readable(self) -> bool:
+        """Whether the stream is readable.
+
+        Returns:
+            Always True.
+        """
+        return True
+
+    def readinto(self, buffer: typing.Any) -> int:
+        """Read the downloaded snapshot bytes into the buffer.
+
+        Args:
+            buffer: The buffer to read into.
+
+        Returns:
+            The number of bytes read, 0 at the end of a successful download.
+        """
+        read = self.reader.readinto(buffer)
+        if not read:
+            # The download has closed the pipe, raise its error if it failed.
+            self.download.result()
+        return read
+
+    def close(self) -> None:
+        """Close the stream and the read end of the pipe."""
+        self.reader.close()
+        super().close()
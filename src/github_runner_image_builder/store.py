@@ -3,9 +3,13 @@
 
 """Module for uploading images to shareable storage."""
 
+import concurrent.futures
+import contextlib
+import functools
+import itertools
 import logging
 from pathlib import Path
-from typing import cast
+from typing import Any, BinaryIO, Iterator, cast
 
 import openstack
 import openstack.connection
@@ -18,9 +22,18 @@ from github_runner_image_builder.errors import OpenstackError, UploadImageError
 
 logger = logging.getLogger(__name__)
 
+# The number of old images to delete concurrently when pruning.
+PRUNE_PARALLELISM = 4
+# The read buffer size of image files being uploaded.
+UPLOAD_BUFFER_SIZE = 4 * 1024 * 1024  # 4 MB
+
 
 def create_snapshot(
-    cloud_name: str, image_name: str, server: Server, keep_revisions: int
+    cloud_name: str,
+    image_name: str,
+    server: Server,
+    keep_revisions: int,
+    connection: openstack.connection.Connection | None = None,
 ) -> Image:
     """Upload image to openstack glance.
 
@@ -29,6 +42,8 @@ def create_snapshot(
         image_name: The image name to upload as.
         server: The running OpenStack server to snapshot.
         keep_revisions: The number of revisions to keep for an image.
+        connection: An already established connection to cloud_name to create the snapshot \
+            with. A new connection is opened and closed if not given.
 
     Raises:
         UploadImageError: If there was an error uploading the image to Openstack Glance.
@@ -36,15 +51,15 @@ def create_snapshot(
     Returns:
         The created image.
     """
-    with openstack.connect(cloud=cloud_name) as connection:
+    with _reuse_or_connect(cloud_name=cloud_name, connection=connection) as cloud_connection:
         try:
             logger.info("Creating image snapshot, %s %s", image_name, server.name)
-            image: Image = connection.create_image_snapshot(
+            image: Image = cloud_connection.create_image_snapshot(
                 name=image_name, server=server.id, wait=True, timeout=60 * 30
             )
             logger.info("Pruning older snapshots, %s keeping %s.", image_name, keep_revisions)
             _prune_old_images(
-                connection=connection, image_name=image_name, num_revisions=keep_revisions
+                connection=cloud_connection, image_name=image_name, num_revisions=keep_revisions
             )
             logger.info("Snapshot created successfully, %s %s.", image_name, image.id)
             return image
@@ -53,8 +68,36 @@ def create_snapshot(
             raise UploadImageError from exc
 
 
-def upload_image(
-    arch: Arch, cloud_name: str, image_name: str, image_path: Path, keep_revisions: int
+def connect(cloud_name: str) -> openstack.connection.Connection:
+    """Connect and authenticate to OpenStack.
+
+    Args:
+        cloud_name: The Openstack cloud to use from clouds.yaml.
+
+    Raises:
+        OpenstackError: If there was an error authenticating to OpenStack.
+
+    Returns:
+        The authenticated OpenStack connection.
+    """
+    connection = openstack.connect(cloud=cloud_name)
+    try:
+        connection.authorize()
+    except openstack.exceptions.SDKException as exc:
+        logger.exception("Failed to authenticate to cloud %s.", cloud_name)
+        connection.close()
+        raise OpenstackError from exc
+    return connection
+
+
+# All arguments are required to upload an image.
+def upload_image(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    arch: Arch,
+    cloud_name: str,
+    image_name: str,
+    image_path: Path,
+    keep_revisions: int,
+    connection: openstack.connection.Connection | None = None,
 ) -> Image:
     """Upload image to openstack glance.
 
@@ -64,6 +107,86 @@ def upload_image(
         image_name: The image name to upload as.
         image_path: The path to image to upload.
         keep_revisions: The number of revisions to keep for an image.
+        connection: An already established connection to cloud_name to upload the image with. \
+            A new connection is opened and closed if not given.
+
+    Returns:
+        The created image.
+    """
+    # The image file is streamed with a large read buffer. The SDK would otherwise open the file
+    # itself with the default buffer size and never close it.
+    with open(image_path, "rb", buffering=UPLOAD_BUFFER_SIZE) as image_file:
+        return upload_image_data(
+            arch=arch,
+            cloud_name=cloud_name,
+            image_name=image_name,
+            image_data=image_file,
+            # The chroot built images and the ubuntu cloud images are already compressed qcow2
+            # images.
+            disk_format="qcow2",
+            keep_revisions=keep_revisions,
+            connection=connection,
+        )
+
+
+# All arguments are required to upload an image.
+def upload_image_data(  # pylint: disable=too-many-arguments, too-many-positional-arguments
+    arch: Arch,
+    cloud_name: str,
+    image_name: str,
+    image_data: BinaryIO,
+    disk_format: str,
+    keep_revisions: int,
+    connection: openstack.connection.Connection | None = None,
+) -> Image:
+    """Upload image data streamed from a file object to openstack glance.
+
+    Args:
+        arch: The image architecture.
+        cloud_name: The Openstack cloud to use from clouds.yaml.
+        image_name: The image name to upload as.
+        image_data: The readable (possibly unseekable) file object of the image data to upload.
+        disk_format: The disk format of the image data.
+        keep_revisions: The number of revisions to keep for an image.
+        connection: An already established connection to cloud_name to upload the image with. \
+            A new connection is opened and closed if not given.
+
+    Returns:
+        The created image.
+    """
+    return _upload(
+        arch=arch,
+        cloud_name=cloud_name,
+        image_name=image_name,
+        image_source={
+            "data": image_data,
+            "disk_format": disk_format,
+            "container_format": "bare",
+        },
+        keep_revisions=keep_revisions,
+        connection=connection,
+    )
+
+
+# All arguments are required to upload an image.
+def _upload(  # pylint: disable=too-many-arguments
+    *,
+    arch: Arch,
+    cloud_name: str,
+    image_name: str,
+    image_source: dict[str, Any],
+    keep_revisions: int,
+    connection: openstack.connection.Connection | None,
+) -> Image:
+    """Upload image to openstack glance and prune older revisions.
+
+    Args:
+        arch: The image architecture.
+        cloud_name: The Openstack cloud to use from clouds.yaml.
+        image_name: The image name to upload as.
+        image_source: The create_image arguments of the image contents to upload.
+        keep_revisions: The number of revisions to keep for an image.
+        connection: An already established connection to cloud_name to upload the image with.
 
     Raises:
         UploadImageError: If there was an error uploading the image to Openstack Glance.
@@ -71,21 +194,21 @@ def upload_image(
     Returns:
         The created image.
     """
-    with openstack.connect(cloud=cloud_name) as connection:
+    with _reuse_or_connect(cloud_name=cloud_name, connection=connection) as cloud_connection:
         try:
             logger.info("Uploading image %s.", image_name)
             # ignore type since the library does not provide correct type hinting but the docstring
             # does define the return type.
-            image: Image = connection.create_image(
+            image: Image = cloud_connection.create_image(
                 name=image_name,
-                filename=str(image_path),
                 properties={"architecture": arch.to_openstack()},
                 allow_duplicates=True,
                 wait=True,
+                **image_source,
             )  # type: ignore
             logger.info("Pruning older images %s, keeping %s.", image_name, keep_revisions)
             _prune_old_images(
-                connection=connection, image_name=image_name, num_revisions=keep_revisions
+                connection=cloud_connection, image_name=image_name, num_revisions=keep_revisions
             )
             logger.info("Image created successfully, %s %s.", image_name, image.id)
             return image
@@ -94,6 +217,23 @@ def upload_image(
             raise UploadImageError from exc
 
 
+def _reuse_or_connect(
+    cloud_name: str, connection: openstack.connection.Connection | None
+) -> contextlib.AbstractContextManager[openstack.connection.Connection]:
+    """Reuse the given connection or open a new connection to the cloud.
+
+    Args:
+        cloud_name: The Openstack cloud to use from clouds.yaml.
+        connection: The established connection to reuse if given.
+
+    Returns:
+        A context manager of the connection, closing it on exit only if it was opened here.
+    """
+    if connection:
+        return contextlib.nullcontext(connection)
+    return openstack.connect(cloud=cloud_name)
+
+
 def _prune_old_images(
     connection: openstack.connection.Connection, image_name: str, num_revisions: int
 ) -> None:
@@ -111,13 +251,23 @@ def _prune_old_images(
     if not images:
         return
     images_to_prune = images[num_revisions:]
-    for image in images_to_prune:
-        try:
-            if not connection.delete_image(image.id, wait=True):
-                logger.exception("Failed to delete image %s:%s.", image.name, image.id)
-                raise OpenstackError(f"Failed to delete image: {image.id}")
-        except openstack.exceptions.OpenStackCloudException as exc:
-            raise OpenstackError from exc
+    if not images_to_prune:
+        return
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(PRUNE_PARALLELISM, len(images_to_prune))
+        ) as executor:
+            # Glance deletes images synchronously, there is no need to poll for the deletion.
+            deleted_results = executor.map(
+                functools.partial(connection.delete_image, wait=False),
+                (image.id for image in images_to_prune),
+            )
+            for image, deleted in zip(images_to_prune, deleted_results):
+                if not deleted:
+                    # The image may have been pruned concurrently by a parallel build.
+                    logger.warning("Image %s:%s already deleted.", image.name, image.id)
+    except openstack.exceptions.OpenStackCloudException as exc:
+        raise OpenstackError from exc
 
 
 def get_latest_build_id(cloud_name: str, image_name: str) -> str:
@@ -131,21 +281,39 @@ def get_latest_build_id(cloud_name: str, image_name: str) -> str:
         The image ID if exists, None otherwise.
     """
     with openstack.connect(cloud=cloud_name) as connection:
-        images = _get_sorted_images_by_created_at(connection=connection, image_name=image_name)
-        if not images:
-            return ""
-        # The type of ID is in string but the library does not provide correct type hints for it.
-        return images[0].id  # type: ignore
+        image = get_latest_image(connection=connection, image_name=image_name)
+    # The type of ID is in string but the library does not provide correct type hints for it.
+    return image.id if image else ""  # type: ignore
+
+
+def get_latest_image(connection: openstack.connection.Connection, image_name: str) -> Image | None:
+    """Fetch the latest image.
+
+    Args:
+        connection: The connected openstack cloud instance.
+        image_name: The image name to search for.
+
+    Returns:
+        The latest image if exists, None otherwise.
+    """
+    images = _get_sorted_images_by_created_at(
+        connection=connection, image_name=image_name, limit=1
+    )
+    return images[0] if images else None
 
 
 def _get_sorted_images_by_created_at(
-    connection: openstack.connection.Connection, image_name: str
+    connection: openstack.connection.Connection, image_name: str, limit: int | None = None
 ) -> list[Image]:
     """Fetch the images sorted by created_at date.
 
+    The images are filtered by name and sorted by Glance rather than listing every image in the
+    project and sorting them locally.
+
     Args:
         connection: The connected openstack cloud instance.
         image_name: The image name to search for.
+        limit: The maximum number of latest images to fetch, all images if None.
 
     Raises:
         OpenstackError: if there was an error fetching the images.
@@ -154,11 +322,15 @@ def _get_sorted_images_by_created_at(
         The images sorted by created_at date with latest first.
     """
     try:
-        images = cast(list[Image], connection.search_images(image_name))
+        # The image proxy is typed as both the v1 and v2 proxy, only the v2 API is used.
+        images = cast(
+            Iterator[Image],
+            connection.image.images(
+                name=image_name, sort="created_at:desc", **({"limit": limit} if limit else {})
+            ),
+        )
+        # The images are paginated lazily, stop before requesting pages past the limit.
+        return list(itertools.islice(images, limit))
     except openstack.exceptions.OpenStackCloudException as exc:
         logger.exception("Failed to search images with name %s.", image_name)
         raise OpenstackError from exc
-
-    # The type of images are list[Image] but the library does not provide correct type hints for
-    # it.
-    return sorted(images, key=lambda image: image.created_at, reverse=True)  # type: ignore
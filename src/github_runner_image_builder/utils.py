@@ -4,8 +4,12 @@
 """Utilities used by the app."""
 
 import functools
+import hashlib
 import logging
+import mmap
+import os
 import time
+from pathlib import Path
 from typing import Callable, Optional, Type, TypeVar
 
 from typing_extensions import ParamSpec
@@ -100,3 +104,28 @@ def retry(  # pylint: disable=too-many-arguments, too-many-positional-arguments
         return fn_with_retry
 
     return retry_decorator
+
+
+def get_file_digest(path: Path, algorithm: str) -> str:
+    """Compute the hex digest of a file.
+
+    hashlib.file_digest is used where available (Python 3.11+). On older versions the file is
+    memory mapped and hashed with a single update call instead of being read in chunks.
+
+    Args:
+        path: The file to hash.
+        algorithm: The hashlib algorithm name, e.g. sha256.
+
+    Returns:
+        The hex digest of the file contents.
+    """
+    with open(path, "rb") as file:
+        # hashlib.file_digest is only available from Python 3.11.
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(file, algorithm).hexdigest()
+        file_hash = hashlib.new(algorithm)
+        # Empty files cannot be memory mapped.
+        if os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                file_hash.update(mapped_file)
+        return file_hash.hexdigest()
@@ -6,7 +6,7 @@
 import dataclasses
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True, slots=True)
 class Commands:
     """Test commands to execute.
 
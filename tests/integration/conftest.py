@@ -2,6 +2,8 @@
 # See LICENSE file for licensing details.
 
 """Fixtures for github runner image builder integration tests."""
+
+import concurrent.futures
 import logging
 import platform
 import secrets
@@ -19,12 +21,18 @@ from openstack.connection import Connection
 from openstack.network.v2.security_group import SecurityGroup
 
 from github_runner_image_builder import config
-from tests.integration import types
+from tests.integration import helpers, types
+
+# Use the libyaml based parser when available.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover
+    from yaml import SafeLoader  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 
 
-@pytest.fixture(scope="module", name="arch")
+@pytest.fixture(scope="session", name="arch")
 def arch_fixture():
     """The testing architecture."""
     arch = platform.machine()
@@ -36,13 +44,13 @@ def arch_fixture():
     raise ValueError(f"Unsupported testing architecture {arch}")
 
 
-@pytest.fixture(scope="module", name="test_id")
+@pytest.fixture(scope="session", name="test_id")
 def test_id_fixture() -> str:
     """The random 2 char test id."""
     return "".join(secrets.choice(string.ascii_lowercase) for _ in range(2))
 
 
-@pytest.fixture(scope="module", name="image")
+@pytest.fixture(scope="session", name="image")
 def image_fixture(pytestconfig: pytest.Config) -> str:
     """The ubuntu image base to build from."""
     image = pytestconfig.getoption("--image")
@@ -50,65 +58,48 @@ def image_fixture(pytestconfig: pytest.Config) -> str:
     return image
 
 
-@pytest.fixture(scope="module", name="image_config")
+@pytest.fixture(scope="session", name="lxd_metadata_tar")
+def lxd_metadata_tar_fixture(image: str, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """The LXD VM image metadata.tar, created once per test session."""
+    return helpers.create_lxd_metadata_tar(
+        image=image, tmp_path=tmp_path_factory.mktemp("lxd-metadata")
+    )
+
+
+@pytest.fixture(scope="session", name="image_config")
 def image_config_fixture(arch: config.Arch, image: str):
     """The image related configuration parameters."""
     return types.ImageConfig(arch=arch, image=image)
 
 
-@pytest.fixture(scope="module", name="openstack_clouds_yaml")
+@pytest.fixture(scope="session", name="openstack_clouds_yaml")
 def openstack_clouds_yaml_fixture(pytestconfig: pytest.Config) -> str:
     """Configured clouds-yaml setting."""
     clouds_yaml = pytestconfig.getoption("--openstack-clouds-yaml")
     return clouds_yaml
 
 
-@pytest.fixture(scope="module", name="private_endpoint_config")
+@pytest.fixture(scope="session", name="arch_option_suffix")
+def arch_option_suffix_fixture(arch: config.Arch) -> str:
+    """The suffix of the testing architecture specific command line options."""
+    return "arm64" if arch == config.Arch.ARM64 else "amd64"
+
+
+@pytest.fixture(scope="session", name="private_endpoint_config")
 def private_endpoint_config_fixture(
-    pytestconfig: pytest.Config, arch: config.Arch
+    pytestconfig: pytest.Config, arch_option_suffix: str
 ) -> types.PrivateEndpointConfig | None:
     """The OpenStack private endpoint configurations."""
-    if arch == config.Arch.ARM64:
-        auth_url = pytestconfig.getoption("--openstack-auth-url-arm64")
-        password = pytestconfig.getoption("--openstack-password-arm64")
-        project_domain_name = pytestconfig.getoption("--openstack-project-domain-name-arm64")
-        project_name = pytestconfig.getoption("--openstack-project-name-arm64")
-        user_domain_name = pytestconfig.getoption("--openstack-user-domain-name-arm64")
-        user_name = pytestconfig.getoption("--openstack-username-arm64")
-        region_name = pytestconfig.getoption("--openstack-region-name-arm64")
-    else:
-        auth_url = pytestconfig.getoption("--openstack-auth-url-amd64")
-        password = pytestconfig.getoption("--openstack-password-amd64")
-        project_domain_name = pytestconfig.getoption("--openstack-project-domain-name-amd64")
-        project_name = pytestconfig.getoption("--openstack-project-name-amd64")
-        user_domain_name = pytestconfig.getoption("--openstack-user-domain-name-amd64")
-        user_name = pytestconfig.getoption("--openstack-username-amd64")
-        region_name = pytestconfig.getoption("--openstack-region-name-amd64")
-    if any(
-        not val
-        for val in (
-            auth_url,
-            password,
-            project_domain_name,
-            project_name,
-            user_domain_name,
-            user_name,
-            region_name,
-        )
-    ):
+    options = {
+        key: pytestconfig.getoption(f"--openstack-{key.replace('_', '-')}-{arch_option_suffix}")
+        for key in types.PrivateEndpointConfig.__annotations__
+    }
+    if not all(options.values()):
         return None
-    return types.PrivateEndpointConfig(
-        auth_url=auth_url,
-        password=password,
-        project_domain_name=project_domain_name,
-        project_name=project_name,
-        user_domain_name=user_domain_name,
-        username=user_name,
-        region_name=region_name,
-    )
+    return typing.cast(types.PrivateEndpointConfig, options)
 
 
-@pytest.fixture(scope="module", name="private_endpoint_clouds_yaml")
+@pytest.fixture(scope="session", name="private_endpoint_clouds_yaml")
 def private_endpoint_clouds_yaml_fixture(
     private_endpoint_config: types.PrivateEndpointConfig | None,
 ) -> typing.Optional[str]:
@@ -130,29 +121,23 @@ def private_endpoint_clouds_yaml_fixture(
     )
 
 
-@pytest.fixture(scope="module", name="network_name")
-def network_name_fixture(pytestconfig: pytest.Config, arch: config.Arch) -> str:
+@pytest.fixture(scope="session", name="network_name")
+def network_name_fixture(pytestconfig: pytest.Config, arch_option_suffix: str) -> str:
     """Network to use to spawn test instances under."""
-    if arch == config.Arch.ARM64:
-        network_name = pytestconfig.getoption("--openstack-network-name-arm64")
-    else:
-        network_name = pytestconfig.getoption("--openstack-network-name-amd64")
+    network_name = pytestconfig.getoption(f"--openstack-network-name-{arch_option_suffix}")
     assert network_name, "Please specify the --openstack-network-name command line option"
     return network_name
 
 
-@pytest.fixture(scope="module", name="flavor_name")
-def flavor_name_fixture(pytestconfig: pytest.Config, arch: config.Arch) -> str:
+@pytest.fixture(scope="session", name="flavor_name")
+def flavor_name_fixture(pytestconfig: pytest.Config, arch_option_suffix: str) -> str:
     """Flavor to create testing instances with."""
-    if arch == config.Arch.ARM64:
-        flavor_name = pytestconfig.getoption("--openstack-flavor-name-arm64")
-    else:
-        flavor_name = pytestconfig.getoption("--openstack-flavor-name-amd64")
+    flavor_name = pytestconfig.getoption(f"--openstack-flavor-name-{arch_option_suffix}")
     assert flavor_name, "Please specify the --openstack-flavor-name command line option"
     return flavor_name
 
 
-@pytest.fixture(scope="module", name="clouds_yaml_contents")
+@pytest.fixture(scope="session", name="clouds_yaml_contents")
 def clouds_yaml_contents_fixture(
     openstack_clouds_yaml: typing.Optional[str], private_endpoint_clouds_yaml: typing.Optional[str]
 ):
@@ -167,29 +152,33 @@ def clouds_yaml_contents_fixture(
     return clouds_yaml_contents
 
 
-@pytest.fixture(scope="module", name="cloud_name")
+@pytest.fixture(scope="session", name="cloud_name")
 def cloud_name_fixture(clouds_yaml_contents: str) -> str:
     """The cloud to use from cloud config."""
-    clouds_yaml = yaml.safe_load(clouds_yaml_contents)
+    clouds_yaml = yaml.load(clouds_yaml_contents, Loader=SafeLoader)
     clouds_yaml_path = Path("clouds.yaml")
-    clouds_yaml_path.write_text(data=clouds_yaml_contents, encoding="utf-8")
+    if (
+        not clouds_yaml_path.exists()
+        or clouds_yaml_path.read_text(encoding="utf-8") != clouds_yaml_contents
+    ):
+        clouds_yaml_path.write_text(data=clouds_yaml_contents, encoding="utf-8")
     first_cloud = next(iter(clouds_yaml["clouds"].keys()))
     return first_cloud
 
 
-@pytest.fixture(scope="module", name="openstack_connection")
+@pytest.fixture(scope="session", name="openstack_connection")
 def openstack_connection_fixture(cloud_name: str) -> Connection:
     """The openstack connection instance."""
     return openstack.connect(cloud_name)
 
 
-@pytest.fixture(scope="module", name="callback_result_path")
+@pytest.fixture(scope="session", name="callback_result_path")
 def callback_result_path_fixture() -> Path:
     """The file created when the callback script is run."""
     return Path("callback_complete")
 
 
-@pytest.fixture(scope="module", name="callback_script")
+@pytest.fixture(scope="session", name="callback_script")
 def callback_script_fixture(callback_result_path: Path) -> Path:
     """The callback script to use with the image builder."""
     callback_script = Path("callback")
@@ -204,7 +193,7 @@ echo $IMAGE_ID | tee {callback_result_path}
     return callback_script
 
 
-@pytest.fixture(scope="module", name="dockerhub_mirror")
+@pytest.fixture(scope="session", name="dockerhub_mirror")
 def dockerhub_mirror_fixture(pytestconfig: pytest.Config) -> urllib.parse.ParseResult | None:
     """Dockerhub mirror URL."""
     dockerhub_mirror_url: str | None = pytestconfig.getoption("--dockerhub-mirror", default=None)
@@ -217,13 +206,13 @@ def dockerhub_mirror_fixture(pytestconfig: pytest.Config) -> urllib.parse.ParseR
     return parse_result
 
 
-@pytest.fixture(scope="module", name="openstack_image_name")
+@pytest.fixture(scope="session", name="openstack_image_name")
 def openstack_image_name_fixture(test_id: str) -> str:
     """The image name to upload to openstack."""
     return f"image-builder-test-image-{test_id}"
 
 
-@pytest.fixture(scope="module", name="ssh_key")
+@pytest.fixture(scope="session", name="ssh_key")
 def ssh_key_fixture(
     openstack_connection: Connection, test_id: str
 ) -> typing.Generator[types.SSHKey, None, None]:
@@ -238,7 +227,7 @@ def ssh_key_fixture(
     openstack_connection.delete_keypair(name=keypair.name)
 
 
-@pytest.fixture(scope="module", name="openstack_metadata")
+@pytest.fixture(scope="session", name="openstack_metadata")
 def openstack_metadata_fixture(
     openstack_connection: Connection,
     ssh_key: types.SSHKey,
@@ -256,7 +245,7 @@ def openstack_metadata_fixture(
     )
 
 
-@pytest.fixture(scope="module", name="openstack_security_group")
+@pytest.fixture(scope="session", name="openstack_security_group")
 def openstack_security_group_fixture(openstack_connection: Connection):
     """An ssh-connectable security group."""
     security_group_name = "github-runner-image-builder-test-security-group"
@@ -268,42 +257,44 @@ def openstack_security_group_fixture(openstack_connection: Connection):
             name=security_group_name,
             description="For servers managed by the github-runner-image-builder app.",
         )
-        # For ping
-        openstack_connection.create_security_group_rule(
-            secgroup_name_or_id=security_group_name,
-            protocol="icmp",
-            direction="ingress",
-            ethertype="IPv4",
-        )
-        # For SSH
-        openstack_connection.create_security_group_rule(
-            # The code is not duplicated, this code is strictly for integration test which should
-            # not be imported from module or referenced from module.
-            # pylint: disable=R0801
-            secgroup_name_or_id=security_group_name,
-            port_range_min="22",
-            port_range_max="22",
-            protocol="tcp",
-            direction="ingress",
-            ethertype="IPv4",
-            # pylint: enable=R0801
-        )
-        # For tmate
-        openstack_connection.create_security_group_rule(
-            secgroup_name_or_id=security_group_name,
-            port_range_min="10022",
-            port_range_max="10022",
-            protocol="tcp",
-            direction="egress",
-            ethertype="IPv4",
+        rules: tuple[dict[str, typing.Any], ...] = (
+            # For ping
+            {"protocol": "icmp", "direction": "ingress", "ethertype": "IPv4"},
+            # For SSH
+            {
+                "port_range_min": "22",
+                "port_range_max": "22",
+                "protocol": "tcp",
+                "direction": "ingress",
+                "ethertype": "IPv4",
+            },
+            # For tmate
+            {
+                "port_range_min": "10022",
+                "port_range_max": "10022",
+                "protocol": "tcp",
+                "direction": "egress",
+                "ethertype": "IPv4",
+            },
         )
+        # The rules are independent of each other, create them concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(rules)) as executor:
+            for future in [
+                executor.submit(
+                    openstack_connection.create_security_group_rule,
+                    secgroup_name_or_id=security_group_name,
+                    **rule,
+                )
+                for rule in rules
+            ]:
+                future.result()
 
     yield security_group
 
     openstack_connection.delete_security_group(security_group_name)
 
 
-@pytest.fixture(scope="module", name="proxy")
+@pytest.fixture(scope="session", name="proxy")
 def proxy_fixture(pytestconfig: pytest.Config) -> types.ProxyConfig:
     """The environment proxy to pass on to the charm/testing model."""
     proxy = pytestconfig.getoption("--proxy")
@@ -3,19 +3,35 @@
 
 """Helper utilities for integration tests."""
 
+import asyncio
 import collections
+import concurrent.futures
+import contextlib
 import dataclasses
+import functools
 import inspect
 import logging
+import os
 import platform
+import shlex
 import tarfile
 import time
 import urllib.parse
 from datetime import datetime, timezone
-from functools import partial
 from pathlib import Path
 from string import Template
-from typing import Awaitable, Callable, Generator, ParamSpec, Protocol, TypeVar, cast
+from typing import (
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Generator,
+    Iterable,
+    Iterator,
+    ParamSpec,
+    Protocol,
+    TypeVar,
+    cast,
+)
 
 import openstack.exceptions
 import tenacity
@@ -40,6 +56,8 @@ P = ParamSpec("P")
 R = TypeVar("R")
 S = Callable[P, R] | Callable[P, Awaitable[R]]
 
+WAIT_FOR_INITIAL_INTERVAL = 0.25  # seconds
+
 
 async def wait_for(
     func: S,
@@ -48,10 +66,13 @@ async def wait_for(
 ) -> R:
     """Wait for function execution to become truthy.
 
+    The interval between ready checks starts at WAIT_FOR_INITIAL_INTERVAL and grows exponentially
+    up to check_interval.
+
     Args:
         func: A callback function to wait to return a truthy value.
         timeout: Time in seconds to wait for function result to become truthy.
-        check_interval: Time in seconds to wait between ready checks.
+        check_interval: Maximum time in seconds to wait between ready checks.
 
     Raises:
         TimeoutError: if the callback function did not return a truthy value within timeout.
@@ -61,6 +82,7 @@ async def wait_for(
     """
     deadline = time.time() + timeout
     is_awaitable = inspect.iscoroutinefunction(func)
+    interval = min(WAIT_FOR_INITIAL_INTERVAL, check_interval)
     while time.time() < deadline:
         if is_awaitable:
             if result := await cast(Awaitable, func()):
@@ -68,7 +90,8 @@ async def wait_for(
         else:
             if result := func():
                 return cast(R, result)
-        time.sleep(check_interval)
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, check_interval)
 
     # final check before raising TimeoutError.
     if is_awaitable:
@@ -81,27 +104,24 @@ async def wait_for(
 
 
 def create_lxd_vm_image(
-    lxd_client: Client, img_path: Path, image: str, tmp_path: Path
+    lxd_client: Client, img_path: Path, image: str, metadata_tar: Path
 ) -> LXDImage:
     """Create LXD VM image.
 
-    1. Creates the metadata.tar.gz file with the corresponding Ubuntu OS image and a pre-defined
-    templates directory. See testdata/templates.
-    2. Uploads the created VM image to LXD - metadata and image of qcow2 format is required.
-    3. Tags the uploaded image with an alias for test use.
+    1. Uploads the VM image to LXD - metadata and image of qcow2 format is required.
+    2. Tags the uploaded image with an alias for test use.
 
     Args:
         lxd_client: PyLXD client.
         img_path: qcow2 (.img) file path to upload.
-        tmp_path: Temporary dir.
         image: The Ubuntu image name.
+        metadata_tar: The metadata.tar file path, see create_lxd_metadata_tar.
 
     Returns:
         The created LXD image.
     """
-    metadata_tar = _create_metadata_tar_gz(image=image, tmp_path=tmp_path)
     lxd_image = _post_vm_img(
-        lxd_client, img_path.read_bytes(), metadata_tar.read_bytes(), public=True
+        lxd_client, image_path=img_path, metadata_path=metadata_tar, public=True
     )
     lxd_image.add_alias(image, f"Ubuntu {image} {IMAGE_TO_TAG[image]} image.")
     return lxd_image
@@ -110,8 +130,14 @@ def create_lxd_vm_image(
 IMAGE_TO_TAG = {"jammy": "22.04", "noble": "24.04"}
 
 
-def _create_metadata_tar_gz(image: str, tmp_path: Path) -> Path:
-    """Create metadata.tar.gz contents.
+METADATA_TAR_BUFSIZE = 64 * tarfile.RECORDSIZE
+
+
+def create_lxd_metadata_tar(image: str, tmp_path: Path) -> Path:
+    """Create metadata.tar contents.
+
+    The metadata.tar holds the metadata.yaml of the corresponding Ubuntu OS image and a
+    pre-defined templates directory. See testdata/templates.
 
     Args:
         image: The ubuntu LTS image name.
@@ -132,28 +158,68 @@ def _create_metadata_tar_gz(image: str, tmp_path: Path) -> Path:
 
     # Pack templates/ and metada.yaml
     templates_path = Path("tests/integration/testdata/templates")
-    metadata_tar = tmp_path / Path("metadata.tar.gz")
+    metadata_tar = tmp_path / Path("metadata.tar")
 
-    with tarfile.open(metadata_tar, "w:gz") as tar:
+    # Stream the tar out with a larger buffer instead of writing it record by record.
+    with tarfile.open(metadata_tar, "w|", bufsize=METADATA_TAR_BUFSIZE) as tar:
         tar.add(meta_path, arcname=meta_path.name)
         tar.add(templates_path, arcname=templates_path.name)
 
     return metadata_tar
 
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclasses.dataclass
+class _UploadChunks:
+    """Sized iterable over the upload request body.
+
+    http.client (through urllib3) reads file-like request bodies in small fixed size blocks while
+    the chunks of an iterable body are sent as they are. The length is given so that the body is
+    still sent with a Content-Length header instead of chunked transfer encoding.
+
+    Attributes:
+        reader: The file-like request body.
+        length: The request body size in bytes.
+    """
+
+    reader: MultipartEncoder | BinaryIO
+    length: int
+
+    def __len__(self) -> int:
+        """Get the request body size.
+
+        Returns:
+            The request body size in bytes.
+        """
+        return self.length
+
+    def __iter__(self) -> Iterator[bytes]:
+        """Iterate over the request body in UPLOAD_CHUNK_SIZE chunks.
+
+        Yields:
+            The request body chunks.
+        """
+        while chunk := self.reader.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+
 # This is a workaround until https://github.com/canonical/pylxd/pull/577 gets merged.
 def _post_vm_img(
     client: Client,
-    image_data: bytes,
-    metadata: bytes | None = None,
+    image_path: Path,
+    metadata_path: Path | None = None,
     public: bool = False,
 ) -> LXDImage:
     """Create an LXD VM image.
 
+    The files are streamed from disk instead of being read into memory.
+
     Args:
         client: The LXD client.
-        image_data: Image qcow2 (.img) file contents in bytes.
-        metadata: The metadata.tar.gz contents in bytes.
+        image_path: Image qcow2 (.img) file path.
+        metadata_path: The metadata.tar file path.
         public: Whether the image should be publicly available.
 
     Returns:
@@ -163,23 +229,31 @@ def _post_vm_img(
     if public:
         headers["X-LXD-Public"] = "1"
 
-    if metadata is not None:
-        # Image uploaded as chunked/stream (metadata, rootfs)
-        # multipart message.
-        # Order of parts is important metadata should be passed first
-        files = collections.OrderedDict(
-            {
-                "metadata": ("metadata", metadata, "application/octet-stream"),
-                # rootfs is container, rootfs.img is VM
-                "rootfs.img": ("rootfs.img", image_data, "application/octet-stream"),
-            }
-        )
-        data = MultipartEncoder(files)
-        headers.update({"Content-Type": data.content_type})
-    else:
-        data = image_data
+    with contextlib.ExitStack() as stack:
+        image_file = stack.enter_context(open(image_path, "rb"))
+        data: _UploadChunks
+        if metadata_path is not None:
+            # Image uploaded as chunked/stream (metadata, rootfs)
+            # multipart message.
+            # Order of parts is important metadata should be passed first
+            files = collections.OrderedDict(
+                {
+                    "metadata": (
+                        "metadata",
+                        stack.enter_context(open(metadata_path, "rb")),
+                        "application/octet-stream",
+                    ),
+                    # rootfs is container, rootfs.img is VM
+                    "rootfs.img": ("rootfs.img", image_file, "application/octet-stream"),
+                }
+            )
+            encoder = MultipartEncoder(files)
+            headers.update({"Content-Type": encoder.content_type})
+            data = _UploadChunks(reader=encoder, length=encoder.len)
+        else:
+            data = _UploadChunks(reader=image_file, length=os.fstat(image_file.fileno()).st_size)
 
-    response = client.api.images.post(data=data, headers=headers)
+        response = client.api.images.post(data=data, headers=headers)
     operation = client.operations.wait_for_operation(response.json()["operation"])
     return LXDImage(client, fingerprint=operation.metadata["fingerprint"])
 
@@ -204,7 +278,7 @@ async def create_lxd_instance(lxd_client: Client, image: str) -> Instance:
         instance_config, wait=True
     )
     instance.start(timeout=10 * 60, wait=True)
-    await wait_for(partial(_instance_running, instance))
+    await wait_for(functools.partial(_instance_running, instance))
 
     return instance
 
@@ -247,6 +321,54 @@ class OpenStackConnectionParams:
     ssh_key: Path
 
 
+SSH_RETRY_INITIAL_DELAY = 0.5  # seconds
+SSH_RETRY_MAX_DELAY = 10  # seconds
+
+
+SSH_PROBE_CONNECT_TIMEOUT = 30  # seconds
+
+
+def _probe_ssh_connection(ip: str, ssh_key: Path) -> SSHConnection | None:
+    """Check whether the address is reachable via SSH.
+
+    Args:
+        ip: The address to SSH into.
+        ssh_key: The path to public ssh_key to create connection with.
+
+    Returns:
+        The SSH connection if the address is reachable, None otherwise.
+    """
+    logger.info("Trying SSH into %s using key: %s...", ip, str(ssh_key.absolute()))
+    ssh_connection = SSHConnection(
+        host=ip,
+        user="ubuntu",
+        connect_kwargs={"key_filename": str(ssh_key.absolute())},
+        # The caller retries until its own deadline, do not block on a single attempt.
+        connect_timeout=SSH_PROBE_CONNECT_TIMEOUT,
+    )
+    try:
+        result: Result = ssh_connection.run("echo 'hello world'")
+    except (NoValidConnectionsError, TimeoutError, SSHException) as exc:
+        logger.warning("Connection not yet ready, %s.", str(exc))
+        return None
+    return ssh_connection if result.ok else None
+
+
+def _close_unused_probe_connection(
+    probe: asyncio.Task[SSHConnection | None], used: SSHConnection | None
+) -> None:
+    """Close the connection established by a probe if it is not the one in use.
+
+    Args:
+        probe: The finished SSH probe task.
+        used: The SSH connection in use.
+    """
+    if probe.cancelled() or probe.exception():
+        return
+    if (ssh_connection := probe.result()) and ssh_connection is not used:
+        ssh_connection.close()
+
+
 async def wait_for_valid_connection(
     connection_params: OpenStackConnectionParams,
     timeout: int = 30 * 60,
@@ -268,37 +390,45 @@ async def wait_for_valid_connection(
         SSHConnection.
     """
     start_time = time.time()
+    # Back off exponentially between attempts, the server is usually reachable within seconds
+    # once it has an address.
+    delay = SSH_RETRY_INITIAL_DELAY
     while time.time() - start_time <= timeout:
         server: Server | None = connection_params.connection.get_server(
             name_or_id=connection_params.server_name
         )
-        if not server or not server.addresses:
-            time.sleep(10)
-            continue
-        for address in server.addresses[connection_params.network]:
-            ip = address["addr"]
-            logger.info(
-                "Trying SSH into %s using key: %s...",
-                ip,
-                str(connection_params.ssh_key.absolute()),
-            )
-            ssh_connection = SSHConnection(
-                host=ip,
-                user="ubuntu",
-                connect_kwargs={"key_filename": str(connection_params.ssh_key.absolute())},
-                connect_timeout=60 * 10,
+        addresses = server.addresses.get(connection_params.network, []) if server else []
+        # Probe all the addresses concurrently, the first reachable address is used.
+        probes = [
+            asyncio.create_task(
+                asyncio.to_thread(
+                    _probe_ssh_connection, ip=address["addr"], ssh_key=connection_params.ssh_key
+                )
             )
+            for address in addresses
+        ]
+        ssh_connection = None
+        try:
+            for probe in asyncio.as_completed(probes):
+                if ssh_connection := await probe:
+                    break
+        finally:
+            # The probe threads cannot be cancelled, close the unused connections once they are
+            # established.
+            for probe_task in probes:
+                probe_task.add_done_callback(
+                    functools.partial(_close_unused_probe_connection, used=ssh_connection)
+                )
+        if ssh_connection:
             try:
-                result: Result = ssh_connection.run("echo 'hello world'")
-                if result.ok:
-                    await _install_proxy(conn=ssh_connection, proxy=proxy)
-                    _configure_dockerhub_mirror(
-                        conn=ssh_connection, dockerhub_mirror=dockerhub_mirror
-                    )
-                    return ssh_connection
+                await _install_proxy(conn=ssh_connection, proxy=proxy)
+                _configure_dockerhub_mirror(conn=ssh_connection, dockerhub_mirror=dockerhub_mirror)
+                return ssh_connection
             except (NoValidConnectionsError, TimeoutError, SSHException) as exc:
                 logger.warning("Connection not yet ready, %s.", str(exc))
-        time.sleep(10)
+                ssh_connection.close()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, SSH_RETRY_MAX_DELAY)
     raise TimeoutError("No valid ssh connections found.")
 
 
@@ -311,7 +441,7 @@ async def _install_proxy(conn: SSHConnection, proxy: types.ProxyConfig | None =
     """
     if not proxy or not proxy.http:
         return
-    await wait_for(partial(_snap_ready, conn))
+    await wait_for(functools.partial(_snap_ready, conn))
 
     command = "sudo snap install aproxy --edge"
     logger.info("Running command: %s", command)
@@ -415,6 +545,36 @@ def format_dockerhub_mirror_microk8s_command(
     )
 
 
+def get_test_commands(
+    dockerhub_mirror: urllib.parse.ParseResult | None, external: bool
+) -> list[commands.Commands]:
+    """Get the test commands to run on the image under test.
+
+    Args:
+        dockerhub_mirror: The dockerhub mirror URL to reduce rate limiting for tests.
+        external: Whether the test is for external VM builder image test.
+
+    Returns:
+        The test commands with the dockerhub mirror command formatted.
+    """
+    test_commands = []
+    for testcmd in commands.TEST_RUNNER_COMMANDS:
+        if not external and testcmd.external:
+            continue
+        if testcmd.name == "configure dockerhub mirror":
+            if not dockerhub_mirror:
+                continue
+            # The commands are frozen, format a copy of the command instead.
+            testcmd = dataclasses.replace(
+                testcmd,
+                command=format_dockerhub_mirror_microk8s_command(
+                    command=testcmd.command, dockerhub_mirror=dockerhub_mirror
+                ),
+            )
+        test_commands.append(testcmd)
+    return test_commands
+
+
 def run_openstack_tests(
     dockerhub_mirror: urllib.parse.ParseResult | None,
     ssh_connection: SSHConnection,
@@ -422,24 +582,53 @@ def run_openstack_tests(
 ):
     """Run test commands on the openstack instance via ssh.
 
+    The test commands are run as a single script in one SSH session, stopping at the first failing
+    command.
+
     Args:
         dockerhub_mirror: The dockerhub mirror URL to reduce rate limiting for tests.
         ssh_connection: The SSH connection instance to OpenStack test server.
         external: Whether the test is for external VM builder image test.
     """
-    for testcmd in commands.TEST_RUNNER_COMMANDS:
-        if not external and testcmd.external:
-            continue
-        if testcmd == "configure dockerhub mirror":
-            if not dockerhub_mirror:
-                continue
-            testcmd.command = format_dockerhub_mirror_microk8s_command(
-                command=testcmd.command, dockerhub_mirror=dockerhub_mirror
-            )
-        logger.info("Running command: %s", testcmd.command)
-        result: Result = ssh_connection.run(testcmd.command, env=testcmd.env)
-        logger.info("Command output: %s %s %s", result.return_code, result.stdout, result.stderr)
-        assert result.return_code == 0
+    script = batch_test_commands(
+        test_commands=get_test_commands(dockerhub_mirror=dockerhub_mirror, external=external)
+    )
+    logger.info("Running commands: %s", script)
+    result: Result = ssh_connection.run(script, warn=True)
+    logger.info("Command output: %s %s %s", result.return_code, result.stdout, result.stderr)
+    failed_markers = [
+        line for line in result.stdout.splitlines() if line.startswith(FAILED_COMMAND_MARKER)
+    ]
+    assert result.return_code == 0, f"Failed test commands: {failed_markers}"
+
+
+FAILED_COMMAND_MARKER = "::failed::"
+
+
+def batch_test_commands(test_commands: Iterable[commands.Commands]) -> str:
+    """Join the test commands into a single shell script.
+
+    Each command is run in a subshell with its additional environment variables. The script exits
+    at the first failing command after printing its name prefixed by FAILED_COMMAND_MARKER.
+
+    Args:
+        test_commands: The test commands to join.
+
+    Returns:
+        The shell script running the test commands in order.
+    """
+    steps = []
+    for testcmd in test_commands:
+        # The env values are not quoted so that they may reference existing variables, e.g. PATH.
+        exports = "".join(
+            f'export {key}="{value}"; ' for key, value in (testcmd.env or {}).items()
+        )
+        failed_message = shlex.quote(f"{FAILED_COMMAND_MARKER}{testcmd.name}")
+        steps.append(
+            f"echo {shlex.quote(f'::running::{testcmd.name}')}\n"
+            f"( {exports}{testcmd.command}\n) || {{ echo {failed_message}; exit 1; }}"
+        )
+    return "\n".join(steps)
 
 
 # This is a simple interface for filtering out openstack objects.
@@ -528,8 +717,11 @@ def create_openstack_server(
             userdata="""#!/bin/bash
 hostnamectl set-hostname github-runner
 """,
-            timeout=60 * 20,
-            wait=True,
+            wait=False,
+        )
+        # Poll the server directly by ID rather than through the cloud layer server lookup.
+        server = openstack_metadata.connection.compute.wait_for_server(
+            server, status="ACTIVE", wait=60 * 20
         )
         logger.info(
             "server console log output: %s",
@@ -541,3 +733,18 @@ hostnamectl set-hostname github-runner
         logger.exception("Failed to create server, %s", dict(server))
     finally:
         openstack_metadata.connection.delete_server(server_name, wait=True)
+
+
+def delete_openstack_images(connection: Connection, image_ids: Iterable[str]) -> None:
+    """Delete OpenStack images concurrently.
+
+    Args:
+        connection: The OpenStack connection instance.
+        image_ids: The IDs of the images to delete.
+    """
+    image_ids = list(image_ids)
+    if not image_ids:
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(image_ids))) as executor:
+        # Consume the results to surface deletion errors.
+        list(executor.map(connection.delete_image, image_ids))
@@ -5,6 +5,7 @@
 
 import glob
 import logging
+import shlex
 
 # Subprocess is used to run the application.
 import subprocess  # nosec: B404
@@ -23,7 +24,7 @@ from pylxd import Client
 
 from github_runner_image_builder.cli import get_latest_build_id
 from github_runner_image_builder.config import IMAGE_OUTPUT_PATH
-from tests.integration import commands, helpers, types
+from tests.integration import helpers, types
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,12 @@ async def openstack_server_fixture(
 ):
     """A testing openstack instance."""
     server_name = f"test-server-{test_id}"
-    images: list[Image] = openstack_metadata.connection.search_images(openstack_image_name)
+    # Let Glance filter the images by name instead of listing every image in the project.
+    images: list[Image] = list(
+        openstack_metadata.connection.image.images(
+            name=openstack_image_name, sort="created_at:desc"
+        )
+    )
     assert images, "No built image found."
     for server in helpers.create_openstack_server(
         openstack_metadata=openstack_metadata,
@@ -47,8 +53,9 @@ async def openstack_server_fixture(
     ):
         yield server
 
-    for image in images:
-        openstack_metadata.connection.delete_image(image.id)
+    helpers.delete_openstack_images(
+        connection=openstack_metadata.connection, image_ids=(image.id for image in images)
+    )
 
 
 @pytest_asyncio.fixture(scope="module", name="ssh_connection")
@@ -87,14 +94,11 @@ def cli_run_fixture(
     This fixture assumes pipx is installed in the system and the github-runner-image-builder has
     been installed using pipx. See testenv:integration section of tox.ini.
     """
-    # This is a locally built application - we can trust it.
-    subprocess.check_call(  # nosec: B603
-        ["/usr/bin/sudo", Path.home() / ".local/bin/github-runner-image-builder", "init"]
-    )
-    subprocess.check_call(  # nosec: B603
+    builder = str(Path.home() / ".local/bin/github-runner-image-builder")
+    init_command = shlex.join([builder, "init"])
+    run_command = shlex.join(
         [
-            "/usr/bin/sudo",
-            Path.home() / ".local/bin/github-runner-image-builder",
+            builder,
             "run",
             cloud_name,
             openstack_image_name,
@@ -106,12 +110,20 @@ def cli_run_fixture(
             str(callback_script.absolute()),
         ]
     )
+    # This is a locally built application - we can trust it. Initialize and run it under a single
+    # sudo invocation.
+    subprocess.check_call(  # nosec: B603
+        ["/usr/bin/sudo", "/bin/bash", "-c", f"{init_command} && {run_command}"]
+    )
 
     yield
 
-    openstack_image: Image
-    for openstack_image in openstack_connection.search_images(openstack_image_name):
-        openstack_connection.delete_image(openstack_image.id)
+    helpers.delete_openstack_images(
+        connection=openstack_connection,
+        image_ids=(
+            image.id for image in openstack_connection.image.images(name=openstack_image_name)
+        ),
+    )
     for image_file in glob.glob("*.img"):
         Path(image_file).unlink(missing_ok=True)
 
@@ -120,7 +132,7 @@ def cli_run_fixture(
 @pytest.mark.amd64
 @pytest.mark.usefixtures("cli_run")
 async def test_image_amd(
-    image: str, tmp_path: Path, dockerhub_mirror: urllib.parse.ParseResult | None
+    image: str, dockerhub_mirror: urllib.parse.ParseResult | None, lxd_metadata_tar: Path
 ):
     """
     arrange: given a built output from the CLI.
@@ -130,29 +142,26 @@ async def test_image_amd(
     lxd = Client()
     logger.info("Creating LXD VM Image.")
     helpers.create_lxd_vm_image(
-        lxd_client=lxd, img_path=IMAGE_OUTPUT_PATH, image=image, tmp_path=tmp_path
+        lxd_client=lxd, img_path=IMAGE_OUTPUT_PATH, image=image, metadata_tar=lxd_metadata_tar
     )
     logger.info("Launching LXD instance.")
     instance = await helpers.create_lxd_instance(lxd_client=lxd, image=image)
 
-    for testcmd in commands.TEST_RUNNER_COMMANDS:
-        if testcmd.external:
-            continue
-        if testcmd.name == "configure dockerhub mirror":
-            if not dockerhub_mirror:
-                continue
-            testcmd.command = helpers.format_dockerhub_mirror_microk8s_command(
-                command=testcmd.command, dockerhub_mirror=dockerhub_mirror
-            )
-        logger.info("Running command: %s", testcmd.command)
-        # run command as ubuntu user. Passing in user argument would not be equivalent to a login
-        # shell which is missing critical environment variables such as $USER and the user groups
-        # are not properly loaded.
-        result = instance.execute(
-            ["su", "--shell", "/bin/bash", "--login", "ubuntu", "-c", testcmd.command]
-        )
-        logger.info("Command output: %s %s %s", result.exit_code, result.stdout, result.stderr)
-        assert result.exit_code == 0
+    script = helpers.batch_test_commands(
+        test_commands=helpers.get_test_commands(dockerhub_mirror=dockerhub_mirror, external=False)
+    )
+    logger.info("Running commands: %s", script)
+    # run commands as ubuntu user. Passing in user argument would not be equivalent to a login
+    # shell which is missing critical environment variables such as $USER and the user groups
+    # are not properly loaded.
+    result = instance.execute(["su", "--shell", "/bin/bash", "--login", "ubuntu", "-c", script])
+    logger.info("Command output: %s %s %s", result.exit_code, result.stdout, result.stderr)
+    failed_markers = [
+        line
+        for line in result.stdout.splitlines()
+        if line.startswith(helpers.FAILED_COMMAND_MARKER)
+    ]
+    assert result.exit_code == 0, f"Failed test commands: {failed_markers}"
 
 
 @pytest.mark.amd64
@@ -165,7 +174,7 @@ async def test_openstack_upload(openstack_connection: Connection, openstack_imag
     act: when openstack images are listed.
     assert: the built image is uploaded in Openstack.
     """
-    assert len(openstack_connection.search_images(openstack_image_name))
+    assert next(openstack_connection.image.images(name=openstack_image_name), None)
 
 
 @pytest.mark.arm64
@@ -6,6 +6,7 @@
 # Need access to protected functions for testing
 # pylint:disable=protected-access
 
+import concurrent.futures
 import functools
 import itertools
 import logging
@@ -144,8 +145,13 @@ async def make_dangling_resources_fixture(
 
     yield
 
-    openstack_metadata.connection.delete_keypair(name=keypair.name)
-    openstack_metadata.connection.delete_server(name_or_id=server.id)
+    # The dangling resources are independent of each other, delete them concurrently.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [
+            executor.submit(openstack_metadata.connection.delete_keypair, name=keypair.name),
+            executor.submit(openstack_metadata.connection.delete_server, name_or_id=server.id),
+        ]:
+            future.result()
 
 
 # the code is similar but the fixture source is localized and is different.
@@ -0,0 +1,29 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Fixtures for github runner image builder unit tests."""
+
+import logging
+from pathlib import Path
+
+import pytest
+
+from github_runner_image_builder import logging as builder_logging
+
+
+@pytest.fixture(scope="function", name="root_logger")
+def root_logger_fixture(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """Root logger logging to tmp_path, restored after the test.
+
+    pytest adds its capture handlers to the root logger while the test runs, the test has to clear
+    the root handlers itself.
+    """
+    root_logger = logging.getLogger()
+    monkeypatch.setattr(root_logger, "handlers", root_logger.handlers)
+    monkeypatch.setattr(root_logger, "level", root_logger.level)
+    monkeypatch.setattr(builder_logging, "LOG_FILE_DIR", tmp_path / "log")
+    monkeypatch.setattr(builder_logging, "LOG_FILE_PATH", tmp_path / "log" / "info.log")
+    monkeypatch.setattr(builder_logging, "ERROR_LOG_FILE_PATH", tmp_path / "log" / "error.log")
+    yield root_logger
+    for handler in root_logger.handlers:
+        handler.close()
@@ -6,6 +6,7 @@
 # Need access to protected functions for testing
 # pylint:disable=protected-access
 
+import os
 import time
 from pathlib import Path
 from typing import Any, Type
@@ -113,6 +114,12 @@ def test_subprocess_call_funcs(
             builder.ImageConnectError,
             id="disconnect image to nbd",
         ),
+        pytest.param(
+            "_create_overlay_image",
+            [MagicMock()],
+            builder.OverlayImageError,
+            id="create overlay image",
+        ),
     ],
 )
 def test_subprocess_func_errors(
@@ -210,6 +217,13 @@ def test__enable_network_block_device_fail(monkeypatch: pytest.MonkeyPatch):
             "Failed to chroot into dir",
             id="Failed to chroot into dir",
         ),
+        pytest.param(
+            builder,
+            "_install_github_runner",
+            MagicMock(side_effect=ChrootBaseError("Failed to install runner")),
+            "Failed to install runner",
+            id="Failed to install runner",
+        ),
         pytest.param(
             builder,
             "_compress_image",
@@ -239,6 +253,10 @@ def test_run_error(
     assert: BuildImageError is raised.
     """
     monkeypatch.setattr(builder, "IMAGE_MOUNT_DIR", MagicMock())
+    monkeypatch.setattr(builder, "STAGE1_IMAGE_DIR", MagicMock())
+    monkeypatch.setattr(builder, "_is_stage1_image_fresh", MagicMock(return_value=False))
+    monkeypatch.setattr(builder.shutil, "move", MagicMock())
+    monkeypatch.setattr(builder, "_create_overlay_image", MagicMock())
     monkeypatch.setattr(cloud_image, "download_and_validate_image", MagicMock())
     monkeypatch.setattr(builder, "_resize_image", MagicMock())
     monkeypatch.setattr(builder, "_connect_image_to_network_block_device", MagicMock())
@@ -256,6 +274,7 @@ def test_run_error(
     monkeypatch.setattr(builder, "_chown_home", MagicMock())
     monkeypatch.setattr(builder, "_disconnect_image_to_network_block_device", MagicMock())
     monkeypatch.setattr(builder, "_compress_image", MagicMock())
+    monkeypatch.setattr(builder.store, "connect", MagicMock())
     monkeypatch.setattr(patch_obj, sub_func, mock)
 
     with pytest.raises(BuildImageError) as exc:
@@ -264,16 +283,56 @@ def test_run_error(
     assert expected_message in str(exc.getrepr())
 
 
+@pytest.mark.parametrize(
+    "connect_mock",
+    [
+        pytest.param(MagicMock(), id="connected"),
+        pytest.param(
+            MagicMock(side_effect=builder.OpenstackError("Authentication failed")),
+            id="connection error",
+        ),
+    ],
+)
+def test_run_build_error_closes_connection(
+    monkeypatch: pytest.MonkeyPatch, connect_mock: MagicMock
+):
+    """
+    arrange: given a monkeypatched _build_image that raises an error.
+    act: when run is called.
+    assert: the build error is raised and the established connection is closed.
+    """
+    monkeypatch.setattr(
+        builder, "_build_image", MagicMock(side_effect=BuildImageError("Build failed"))
+    )
+    monkeypatch.setattr(builder.store, "connect", connect_mock)
+    monkeypatch.setattr(builder.store, "upload_image", upload_mock := MagicMock())
+
+    with pytest.raises(BuildImageError) as exc:
+        builder.run(cloud_name=MagicMock(), image_config=MagicMock(), keep_revisions=MagicMock())
+
+    assert "Build failed" in str(exc.getrepr())
+    connect_mock.assert_called_once()
+    if not connect_mock.side_effect:
+        connect_mock.return_value.close.assert_called_once()
+    upload_mock.assert_not_called()
+
+
 def test_run(monkeypatch: pytest.MonkeyPatch):
     """
     arrange: given a monkeypatched functions of run that raises exceptions.
     act: when run is called.
-    assert: BuildImageError is raised.
+    assert: the image is uploaded and the image is unmounted before every nbd disconnect.
     """
     monkeypatch.setattr(builder, "IMAGE_MOUNT_DIR", MagicMock())
+    monkeypatch.setattr(builder, "STAGE1_IMAGE_DIR", MagicMock())
+    monkeypatch.setattr(builder, "_is_stage1_image_fresh", MagicMock(return_value=False))
+    monkeypatch.setattr(builder.shutil, "move", MagicMock())
+    monkeypatch.setattr(builder, "_create_overlay_image", MagicMock())
     monkeypatch.setattr(cloud_image, "download_and_validate_image", MagicMock())
     monkeypatch.setattr(builder, "_resize_image", MagicMock())
-    monkeypatch.setattr(builder, "_connect_image_to_network_block_device", MagicMock())
+    nbd_mock = MagicMock()
+    monkeypatch.setattr(builder, "_unmount_build_path", nbd_mock.unmount)
+    monkeypatch.setattr(builder, "_connect_image_to_network_block_device", nbd_mock.connect)
     monkeypatch.setattr(builder, "_resize_mount_partitions", MagicMock())
     monkeypatch.setattr(builder, "_replace_mounted_resolv_conf", MagicMock())
     monkeypatch.setattr(builder, "_install_yq", MagicMock())
@@ -286,16 +345,157 @@ def test_run(monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setattr(builder, "_install_yarn", MagicMock())
     monkeypatch.setattr(builder, "_install_github_runner", MagicMock())
     monkeypatch.setattr(builder, "_chown_home", MagicMock())
-    monkeypatch.setattr(builder, "_disconnect_image_to_network_block_device", MagicMock())
+    monkeypatch.setattr(builder, "_disconnect_image_to_network_block_device", nbd_mock.disconnect)
     monkeypatch.setattr(builder, "_compress_image", MagicMock())
-    monkeypatch.setattr(
-        builder.store, "upload_image", MagicMock(return_value=(test_image := MagicMock()))
-    )
+    monkeypatch.setattr(builder.store, "connect", connect_mock := MagicMock())
+    upload_mock = MagicMock(return_value=(test_image := MagicMock()))
+    monkeypatch.setattr(builder.store, "upload_image", upload_mock)
 
     assert (
         builder.run(cloud_name=MagicMock(), image_config=MagicMock(), keep_revisions=MagicMock())
         == test_image.id
     )
+    connect_mock.assert_called_once()
+    assert (
+        upload_mock.call_args.kwargs["connection"]
+        == connect_mock.return_value.__enter__.return_value
+    )
+    # initial cleanup, stage1 image build and the final image build.
+    assert [call[0] for call in nbd_mock.method_calls] == [
+        "unmount",
+        "disconnect",
+        "connect",
+        "unmount",
+        "disconnect",
+        "connect",
+        "unmount",
+        "disconnect",
+    ]
+
+
+def test__get_stage1_image_fresh(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a fresh cached stage1 image.
+    act: when _get_stage1_image is called.
+    assert: the cached stage1 image is returned without building a new one.
+    """
+    monkeypatch.setattr(builder, "STAGE1_IMAGE_DIR", tmp_path)
+    (tmp_path / f"jammy-x64-v{builder.STAGE1_VERSION}.img").touch()
+    monkeypatch.setattr(builder, "_build_stage1_image", build_mock := MagicMock())
+
+    assert (
+        builder._get_stage1_image(
+            arch=config.Arch.X64, base_image=config.BaseImage.JAMMY, deadline=MagicMock()
+        )
+        == tmp_path / f"jammy-x64-v{builder.STAGE1_VERSION}.img"
+    )
+    build_mock.assert_not_called()
+
+
+def test__get_stage1_image(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given no cached stage1 image.
+    act: when _get_stage1_image is called.
+    assert: the stage1 image is built from the base image and cached.
+    """
+    monkeypatch.setattr(builder, "STAGE1_IMAGE_DIR", cache_dir := tmp_path / "cache")
+    (base_image_path := tmp_path / "base.img").write_text("base", encoding="utf-8")
+    monkeypatch.setattr(
+        cloud_image, "download_and_validate_image", MagicMock(return_value=base_image_path)
+    )
+    monkeypatch.setattr(builder, "_build_stage1_image", build_mock := MagicMock())
+
+    stage1_image_path = builder._get_stage1_image(
+        arch=config.Arch.X64, base_image=config.BaseImage.JAMMY, deadline=MagicMock()
+    )
+
+    build_mock.assert_called_once()
+    assert stage1_image_path.parent == cache_dir
+    assert stage1_image_path.read_text(encoding="utf-8") == "base"
+
+
+@pytest.mark.parametrize(
+    "age, expected",
+    [
+        pytest.param(0, True, id="fresh"),
+        pytest.param(builder.STAGE1_MAX_AGE + 1, False, id="stale"),
+    ],
+)
+def test__is_stage1_image_fresh(tmp_path: Path, age: int, expected: bool):
+    """
+    arrange: given a stage1 image of a given age.
+    act: when _is_stage1_image_fresh is called.
+    assert: the image is considered fresh only within the maximum age.
+    """
+    (image_path := tmp_path / "stage1.img").touch()
+    modified_time = time.time() - age
+    os.utime(image_path, (modified_time, modified_time))
+
+    assert builder._is_stage1_image_fresh(image_path=image_path) == expected
+
+
+def test__is_stage1_image_fresh_not_exists(tmp_path: Path):
+    """
+    arrange: given a stage1 image path that does not exist.
+    act: when _is_stage1_image_fresh is called.
+    assert: False is returned.
+    """
+    assert not builder._is_stage1_image_fresh(image_path=tmp_path / "stage1.img")
+
+
+def test__create_overlay_image(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a monkeypatched subprocess call.
+    act: when _create_overlay_image is called.
+    assert: an overlay image backed by the given image is created.
+    """
+    monkeypatch.setattr(builder, "OVERLAY_IMAGE_PATH", overlay_path := tmp_path / "overlay.img")
+    monkeypatch.setattr(subprocess, "check_output", check_output_mock := MagicMock())
+
+    assert (
+        builder._create_overlay_image(backing_image_path=tmp_path / "stage1.img") == overlay_path
+    )
+    assert str(tmp_path / "stage1.img") in check_output_mock.call_args.args[0]
+
+
+def test__create_overlay_image_fail(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given subprocess check_output that raises CalledProcessError.
+    act: when _create_overlay_image is called.
+    assert: OverlayImageError is raised.
+    """
+    monkeypatch.setattr(builder, "OVERLAY_IMAGE_PATH", tmp_path / "overlay.img")
+    monkeypatch.setattr(
+        subprocess,
+        "check_output",
+        MagicMock(side_effect=subprocess.CalledProcessError(1, [], "Backing file not found")),
+    )
+
+    with pytest.raises(builder.OverlayImageError) as exc:
+        builder._create_overlay_image(backing_image_path=tmp_path / "stage1.img")
+
+    assert "Backing file not found" in str(exc.getrepr())
+
+
+@pytest.mark.parametrize(
+    "timeout, max_timeout, expected",
+    [
+        pytest.param(100, 10, 10, id="deadline later than max timeout"),
+        pytest.param(10, 100, 10, id="deadline earlier than max timeout"),
+        pytest.param(-10, 100, 0, id="deadline passed"),
+    ],
+)
+def test__deadline_timeout(
+    monkeypatch: pytest.MonkeyPatch, timeout: float, max_timeout: float, expected: float
+):
+    """
+    arrange: given a deadline and a monkeypatched monotonic clock.
+    act: when the deadline timeout is calculated.
+    assert: the timeout is bounded by the remaining time until the deadline.
+    """
+    monkeypatch.setattr(builder.time, "monotonic", MagicMock(return_value=0))
+
+    assert builder._Deadline(timeout=timeout).timeout(max_timeout) == expected
 
 
 def test__resize_image_fail(monkeypatch: pytest.MonkeyPatch):
@@ -7,6 +7,7 @@
 # pylint:disable=protected-access
 
 import itertools
+import logging
 import os
 from pathlib import Path
 from unittest.mock import MagicMock
@@ -14,7 +15,7 @@ from unittest.mock import MagicMock
 import pytest
 from click.testing import CliRunner
 
-from github_runner_image_builder import cli, config
+from github_runner_image_builder import builder, cli, config, openstack_builder, store
 from github_runner_image_builder.cli import main
 
 
@@ -23,6 +24,7 @@ def callback_path_fixture(tmp_path: Path):
     """The testing callback file path."""
     test_path = tmp_path / "test"
     test_path.touch()
+    test_path.chmod(0o755)
     return test_path
 
 
@@ -105,10 +107,8 @@ def test_initialize(monkeypatch: pytest.MonkeyPatch, cli_runner: CliRunner, flag
     act: when cli init is invoked.
     assert: monkeypatched function is called.
     """
-    monkeypatch.setattr(cli.builder, "initialize", (mock_builder_init_func := MagicMock()))
-    monkeypatch.setattr(
-        cli.openstack_builder, "initialize", (mock_openstack_init_func := MagicMock())
-    )
+    monkeypatch.setattr(builder, "initialize", (mock_builder_init_func := MagicMock()))
+    monkeypatch.setattr(openstack_builder, "initialize", (mock_openstack_init_func := MagicMock()))
 
     cli_runner.invoke(main, args=["init", *flags])
 
@@ -155,17 +155,53 @@ def test_latest_build_id(monkeypatch: pytest.MonkeyPatch, cli_runner: CliRunner)
     """
     arrange: given valid latest-build-id args.
     act: when cli is invoked with latest-build-id.
-    assert: latest-build-id is returned.
+    assert: latest-build-id is returned without a trailing newline.
     """
     monkeypatch.setattr(
-        cli.store, "get_latest_build_id", MagicMock(return_value=(test_id := "test-id"))
+        store, "get_latest_build_id", MagicMock(return_value=(test_id := "test-id"))
     )
 
     result = cli_runner.invoke(
         main, args=["latest-build-id", "test-cloud-name", "test-image-name"]
     )
 
+    assert result.exit_code == 0
+    assert not result.output.endswith("\n")
+    assert result.output == test_id
+
+
+@pytest.mark.parametrize(
+    "log_level_args",
+    [
+        pytest.param([], id="default"),
+        pytest.param(["--log-level", "debug"], id="lowercase name"),
+        pytest.param(["--log-level", "WARNING"], id="uppercase name"),
+        pytest.param(["--log-level", "40"], id="number"),
+    ],
+)
+def test_latest_build_id_configures_logging(
+    monkeypatch: pytest.MonkeyPatch,
+    cli_runner: CliRunner,
+    root_logger: logging.Logger,
+    log_level_args: list[str],
+):
+    """
+    arrange: given an unconfigured root logger and a log level option.
+    act: when cli is invoked with latest-build-id.
+    assert: logging is configured and latest-build-id is returned.
+    """
+    monkeypatch.setattr(
+        store, "get_latest_build_id", MagicMock(return_value=(test_id := "test-id"))
+    )
+    root_logger.handlers = []
+
+    result = cli_runner.invoke(
+        main, args=[*log_level_args, "latest-build-id", "test-cloud-name", "test-image-name"]
+    )
+
+    assert result.exit_code == 0, result.output
     assert result.output == test_id
+    assert root_logger.handlers
 
 
 @pytest.mark.parametrize(
@@ -207,6 +243,28 @@ def test_invalid_run_args(cli_runner: CliRunner, run_inputs: dict, invalid_args:
     )
 
 
+def test_run_non_executable_callback_script(cli_runner: CliRunner, callback_path: Path):
+    """
+    arrange: given a callback script without the executable permission.
+    act: when cli is invoked with run.
+    assert: Error output is printed before any build is run.
+    """
+    callback_path.chmod(0o644)
+
+    result = cli_runner.invoke(
+        main,
+        args=[
+            "run",
+            "test-cloud-name",
+            "test-image-name",
+            "--callback-script",
+            str(callback_path),
+        ],
+    )
+
+    assert "Error: Invalid value for" in result.output
+
+
 @pytest.mark.parametrize(
     "callback_script, flags",
     [
@@ -226,10 +284,10 @@ def test_run(
     act: when _build is called.
     assert: the mock function is called.
     """
-    monkeypatch.setattr(cli.builder, "run", MagicMock())
-    monkeypatch.setattr(cli.openstack_builder, "run", MagicMock())
-    monkeypatch.setattr(cli.store, "upload_image", MagicMock())
-    monkeypatch.setattr(cli.subprocess, "check_call", MagicMock())
+    monkeypatch.setattr(builder, "run", MagicMock())
+    monkeypatch.setattr(openstack_builder, "run", openstack_builder_run_mock := MagicMock())
+    monkeypatch.setattr(store, "upload_image", MagicMock())
+    monkeypatch.setattr(cli.os, "execv", execv_mock := MagicMock())
     command = [
         "run",
         "--base-image",
@@ -240,6 +298,7 @@ def test_run(
     ]
     if callback_script:
         (callback_script_path := tmp_path / callback_script).touch(exist_ok=True)
+        callback_script_path.chmod(0o755)
         command.extend(["--callback-script", str(callback_script_path)])
 
     result = cli_runner.invoke(
@@ -248,6 +307,13 @@ def test_run(
     )
 
     assert result.exit_code == 0
+    if callback_script:
+        image_ids = openstack_builder_run_mock.return_value
+        execv_mock.assert_called_once_with(
+            str(callback_script_path), [str(callback_script_path), image_ids]
+        )
+    else:
+        execv_mock.assert_not_called()
 
 
 def test__load_secrets():
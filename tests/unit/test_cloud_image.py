@@ -94,13 +94,15 @@ def test__download_and_validate_image_no_shasum(
 
 
 def test_download_and_validate_image_invalid_checksum(
-    monkeypatch: pytest.MonkeyPatch,
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
 ):
     """
     arrange: given monkeypatched _validate_checksum that returns false.
     act: when download_and_validate_image is called.
-    assert: A BaseImageDownloadError is raised.
+    assert: A BaseImageDownloadError is raised and the cache metadata is invalidated.
     """
+    monkeypatch.setattr(cloud_image, "BASE_IMAGE_CACHE_DIR", tmp_path)
+    (cache_meta_path := tmp_path / "jammy-server-cloudimg-x64.img.meta").touch()
     monkeypatch.setattr(cloud_image, "_get_supported_runner_arch", MagicMock(return_value="x64"))
     monkeypatch.setattr(cloud_image, "_download_base_image", MagicMock())
     monkeypatch.setattr(
@@ -114,6 +116,7 @@ def test_download_and_validate_image_invalid_checksum(
         cloud_image.download_and_validate_image(arch=Arch.X64, base_image=BaseImage.JAMMY)
 
     assert "Invalid checksum." in str(exc.getrepr())
+    assert not cache_meta_path.exists()
 
 
 def test_download_and_validate_image(monkeypatch: pytest.MonkeyPatch):
@@ -168,7 +171,7 @@ def test__get_supported_runner_arch(arch: Arch, expected: SupportedBaseImageArch
     assert cloud_image._get_supported_runner_arch(arch) == expected
 
 
-def test__download_base_image_error(monkeypatch: pytest.MonkeyPatch):
+def test__download_base_image_error(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
     """
     arrange: given monkeypatched urlretrieve function that raises an error.
     act: when _download_base_image is called.
@@ -176,15 +179,16 @@ def test__download_base_image_error(monkeypatch: pytest.MonkeyPatch):
     """
     # Bypass decorated retry sleep
     monkeypatch.setattr(time, "sleep", MagicMock())
+    monkeypatch.setattr(cloud_image, "BASE_IMAGE_CACHE_DIR", tmp_path)
     monkeypatch.setattr(
-        cloud_image.requests,
+        cloud_image._HTTP_SESSION,
         "get",
         MagicMock(side_effect=cloud_image.requests.exceptions.HTTPError()),
     )
 
     with pytest.raises(BaseImageDownloadError):
         cloud_image._download_base_image(
-            base_image=MagicMock(), bin_arch=MagicMock(), output_filename=MagicMock()
+            base_image=MagicMock(), bin_arch=MagicMock(), output_filename="test_file_name"
         )
 
 
@@ -195,8 +199,11 @@ def test__download_base_image(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
     assert: Path from output_filename input is returned.
     """
     response_mock = MagicMock()
+    response_mock.status_code = 200
+    response_mock.headers = {"ETag": "test-etag", "Last-Modified": "test-last-modified"}
     response_mock.iter_content.return_value = [b"content-1", b"content-2"]
-    monkeypatch.setattr(cloud_image.requests, "get", MagicMock(return_value=response_mock))
+    monkeypatch.setattr(cloud_image._HTTP_SESSION, "get", MagicMock(return_value=response_mock))
+    monkeypatch.setattr(cloud_image, "BASE_IMAGE_CACHE_DIR", cache_dir := tmp_path / "cache")
     test_file = tmp_path / "test_file_name"
 
     assert (
@@ -205,6 +212,105 @@ def test__download_base_image(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
             base_image=MagicMock(), bin_arch=MagicMock(), output_filename=str(test_file)
         ).name
     )
+    assert test_file.read_bytes() == b"content-1content-2"
+    assert (cache_dir / test_file.name).read_bytes() == b"content-1content-2"
+    assert cloud_image._get_conditional_headers(
+        cached_image_path=cache_dir / test_file.name,
+        cache_meta_path=cloud_image._get_cache_meta_path(cache_dir / test_file.name),
+    ) == {"If-None-Match": "test-etag", "If-Modified-Since": "test-last-modified"}
+
+
+def test__download_base_image_interrupted(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a monkeypatched requests function whose response fails mid download.
+    act: when _download_base_image is called.
+    assert: the error is raised and no partial download or cached image is left behind.
+    """
+    # Bypass decorated retry sleep
+    monkeypatch.setattr(time, "sleep", MagicMock())
+    response_mock = MagicMock()
+    response_mock.status_code = 200
+    response_mock.iter_content.side_effect = cloud_image.requests.exceptions.ChunkedEncodingError(
+        "Connection broken"
+    )
+    monkeypatch.setattr(cloud_image._HTTP_SESSION, "get", MagicMock(return_value=response_mock))
+    monkeypatch.setattr(cloud_image, "BASE_IMAGE_CACHE_DIR", cache_dir := tmp_path / "cache")
+
+    with pytest.raises(cloud_image.requests.exceptions.ChunkedEncodingError):
+        cloud_image._download_base_image(
+            base_image=MagicMock(),
+            bin_arch=MagicMock(),
+            output_filename=str(tmp_path / "test_file_name"),
+        )
+
+    assert not list(cache_dir.iterdir())
+
+
+def test__download_base_image_not_modified(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given a cached base image and a monkeypatched requests function that returns \
+        304 Not Modified.
+    act: when _download_base_image is called.
+    assert: the cached image is copied to the output path.
+    """
+    monkeypatch.setattr(cloud_image, "BASE_IMAGE_CACHE_DIR", tmp_path)
+    (tmp_path / "test_file_name").write_bytes(b"cached-content")
+    cloud_image._get_cache_meta_path(tmp_path / "test_file_name").write_text(
+        '{"etag": "test-etag", "last_modified": ""}', encoding="utf-8"
+    )
+    response_mock = MagicMock()
+    response_mock.status_code = 304
+    monkeypatch.setattr(cloud_image._HTTP_SESSION, "get", get_mock := MagicMock())
+    get_mock.return_value = response_mock
+    test_file = tmp_path / "output" / "test_file_name"
+    test_file.parent.mkdir()
+
+    cloud_image._download_base_image(
+        base_image=BaseImage.JAMMY, bin_arch="amd64", output_filename=str(test_file)
+    )
+
+    assert get_mock.call_args.kwargs["headers"] == {"If-None-Match": "test-etag"}
+    response_mock.iter_content.assert_not_called()
+    response_mock.close.assert_called_once()
+    assert test_file.read_bytes() == b"cached-content"
+
+
+@pytest.mark.parametrize(
+    "cache_meta",
+    [
+        pytest.param(None, id="no metadata"),
+        pytest.param("invalid json", id="invalid metadata"),
+    ],
+)
+def test__get_conditional_headers_no_cache(tmp_path: Path, cache_meta: str | None):
+    """
+    arrange: given a cached image with missing or invalid cache metadata.
+    act: when _get_conditional_headers is called.
+    assert: no conditional headers are returned.
+    """
+    (cached_image_path := tmp_path / "test_image").touch()
+    cache_meta_path = cloud_image._get_cache_meta_path(cached_image_path)
+    if cache_meta is not None:
+        cache_meta_path.write_text(cache_meta, encoding="utf-8")
+
+    assert not cloud_image._get_conditional_headers(
+        cached_image_path=cached_image_path, cache_meta_path=cache_meta_path
+    )
+
+
+def test__get_conditional_headers_last_modified_only(tmp_path: Path):
+    """
+    arrange: given a cached image with cache metadata without an ETag.
+    act: when _get_conditional_headers is called.
+    assert: only the If-Modified-Since header is returned.
+    """
+    (cached_image_path := tmp_path / "test_image").touch()
+    cache_meta_path = cloud_image._get_cache_meta_path(cached_image_path)
+    cache_meta_path.write_text('{"etag": "", "last_modified": "test-last-modified"}', "utf-8")
+
+    assert cloud_image._get_conditional_headers(
+        cached_image_path=cached_image_path, cache_meta_path=cache_meta_path
+    ) == {"If-Modified-Since": "test-last-modified"}
 
 
 def test__fetch_shasums_error(monkeypatch: pytest.MonkeyPatch):
@@ -216,7 +322,7 @@ def test__fetch_shasums_error(monkeypatch: pytest.MonkeyPatch):
     # Bypass decorated retry sleep
     monkeypatch.setattr(time, "sleep", MagicMock())
     monkeypatch.setattr(
-        cloud_image.requests,
+        cloud_image._HTTP_SESSION,
         "get",
         MagicMock(side_effect=cloud_image.requests.RequestException("Content too short")),
     )
@@ -243,7 +349,7 @@ test_shasum3 *file3
 """,
         encoding="utf-8",
     )
-    monkeypatch.setattr(cloud_image.requests, "get", MagicMock(return_value=mock_response))
+    monkeypatch.setattr(cloud_image._HTTP_SESSION, "get", MagicMock(return_value=mock_response))
 
     assert {
         "file1": "test_shasum1",
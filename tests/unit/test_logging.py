@@ -0,0 +1,62 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Unit tests for logging module."""
+
+import logging
+from pathlib import Path
+
+import pytest
+
+from github_runner_image_builder import logging as builder_logging
+
+
+@pytest.mark.parametrize(
+    "log_level, expected_level",
+    [
+        pytest.param("info", logging.INFO, id="lowercase name"),
+        pytest.param("DEBUG", logging.DEBUG, id="uppercase name"),
+        pytest.param("30", logging.WARNING, id="number string"),
+        pytest.param(logging.ERROR, logging.ERROR, id="number"),
+    ],
+)
+def test_configure(
+    root_logger: logging.Logger, tmp_path: Path, log_level: str | int, expected_level: int
+):
+    """
+    arrange: given a root logger without handlers.
+    act: when configure is called.
+    assert: the log file and stderr handlers are added and the log level is applied.
+    """
+    root_logger.handlers = []
+
+    builder_logging.configure(log_level=log_level)
+
+    assert root_logger.level == expected_level
+    file_handlers = [
+        handler for handler in root_logger.handlers if isinstance(handler, logging.FileHandler)
+    ]
+    assert sorted(Path(handler.baseFilename) for handler in file_handlers) == [
+        tmp_path / "log" / "error.log",
+        tmp_path / "log" / "info.log",
+    ]
+    assert file_handlers[0].level == expected_level
+    # FileHandler is a StreamHandler subclass, match the stderr handler type exactly.
+    assert any(
+        type(handler) is logging.StreamHandler  # pylint: disable=unidiomatic-typecheck
+        for handler in root_logger.handlers
+    )
+
+
+def test_configure_already_configured(root_logger: logging.Logger, tmp_path: Path):
+    """
+    arrange: given a root logger with a handler.
+    act: when configure is called.
+    assert: the root logger is left as is and no log files are created.
+    """
+    root_logger.handlers = [handler := logging.NullHandler()]
+
+    builder_logging.configure(log_level="info")
+
+    assert root_logger.handlers == [handler]
+    assert not (tmp_path / "log").exists()
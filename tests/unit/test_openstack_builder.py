@@ -7,11 +7,15 @@
 # module.
 # pylint:disable=protected-access,too-many-lines
 
+import concurrent.futures
+import hashlib
+import os
 import pathlib
 import typing
 import urllib.parse
 from unittest.mock import MagicMock
 
+import openstack.exceptions
 import paramiko
 import paramiko.ssh_exception
 import pytest
@@ -21,6 +25,12 @@ import yaml
 from github_runner_image_builder import cloud_image, errors, openstack_builder, store
 
 
+@pytest.fixture(autouse=True, name="unset_os_cloud")
+def unset_os_cloud_fixture(monkeypatch: pytest.MonkeyPatch):
+    """Unset the OS_CLOUD environment variable of the test environment."""
+    monkeypatch.delenv("OS_CLOUD", raising=False)
+
+
 def test_determine_cloud_no_clouds_yaml_error(monkeypatch: pytest.MonkeyPatch):
     """
     arrange: given a monkeypatched CLOUD_YAML_PATHS that returns no paths.
@@ -65,6 +75,18 @@ def test_determine_cloud_user_input():
     assert openstack_builder.determine_cloud(test_cloud_name) == test_cloud_name
 
 
+def test_determine_cloud_env(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given the OS_CLOUD environment variable and no clouds.yaml.
+    act: when determine_cloud is called.
+    assert: the OS_CLOUD cloud name is returned.
+    """
+    monkeypatch.setenv("OS_CLOUD", "testcloud")
+    monkeypatch.setattr(openstack_builder, "CLOUD_YAML_PATHS", tuple())
+
+    assert openstack_builder.determine_cloud() == "testcloud"
+
+
 def test_determine_cloud(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path):
     """
     arrange: given monkeypatched clouds.yaml path.
@@ -88,6 +110,7 @@ def test_initialize(monkeypatch: pytest.MonkeyPatch):
     assert: expected module calls are made.
     """
     monkeypatch.setattr(cloud_image, "download_and_validate_image", (download_mock := MagicMock()))
+    monkeypatch.setattr(store, "get_latest_image", MagicMock(return_value=None))
     monkeypatch.setattr(store, "upload_image", (upload_mock := MagicMock()))
     monkeypatch.setattr(openstack_builder.openstack, "connect", (connect_mock := MagicMock()))
     monkeypatch.setattr(openstack_builder, "_create_keypair", (create_keypair_mock := MagicMock()))
@@ -97,13 +120,68 @@ def test_initialize(monkeypatch: pytest.MonkeyPatch):
 
     openstack_builder.initialize(MagicMock(), MagicMock(), MagicMock())
 
-    download_mock.assert_called()
-    upload_mock.assert_called()
-    connect_mock.assert_called()
+    assert download_mock.call_count == 2
+    assert upload_mock.call_count == 2
+    connect_mock.assert_called_once()
+    assert all(
+        call.kwargs["connection"] == connect_mock.return_value.__enter__.return_value
+        for call in upload_mock.call_args_list
+    )
     create_keypair_mock.assert_called()
     create_security_group_mock.assert_called()
 
 
+def test__seed_base_image_up_to_date(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path):
+    """
+    arrange: given a monkeypatched base image matching the hash of the uploaded image.
+    act: when _seed_base_image is called.
+    assert: the base image is not uploaded again.
+    """
+    (image_path := tmp_path / "base.img").write_bytes(b"base image")
+    monkeypatch.setattr(
+        cloud_image, "download_and_validate_image", MagicMock(return_value=image_path)
+    )
+    image_mock = MagicMock()
+    image_mock.hash_algo = "sha512"
+    image_mock.hash_value = hashlib.sha512(b"base image").hexdigest()
+    monkeypatch.setattr(store, "get_latest_image", MagicMock(return_value=image_mock))
+    monkeypatch.setattr(store, "upload_image", (upload_mock := MagicMock()))
+
+    openstack_builder._seed_base_image(
+        arch=openstack_builder.Arch.X64,
+        base=openstack_builder.BaseImage.JAMMY,
+        cloud_name=MagicMock(),
+        conn=MagicMock(),
+    )
+
+    upload_mock.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "hash_algo, hash_value",
+    [
+        pytest.param("sha512", hashlib.sha512(b"old image").hexdigest(), id="hash mismatch"),
+        pytest.param("sha512", None, id="no hash"),
+        pytest.param("unknown", "hash", id="unsupported hash algorithm"),
+    ],
+)
+def test__is_image_up_to_date_outdated(
+    tmp_path: pathlib.Path, hash_algo: str, hash_value: str | None
+):
+    """
+    arrange: given an uploaded image whose hash does not match or cannot be compared.
+    act: when _is_image_up_to_date is called.
+    assert: False is returned.
+    """
+    (image_path := tmp_path / "base.img").write_bytes(b"base image")
+    image_mock = MagicMock()
+    image_mock.hash_algo = hash_algo
+    image_mock.hash_value = hash_value
+
+    assert not openstack_builder._is_image_up_to_date(image=image_mock, image_path=image_path)
+    assert not openstack_builder._is_image_up_to_date(image=None, image_path=image_path)
+
+
 def test__create_keypair_already_exists(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path):
     """
     arrange: given monkeypatched openstack connection with keys and mocked key path that exists.
@@ -113,13 +191,45 @@ def test__create_keypair_already_exists(monkeypatch: pytest.MonkeyPatch, tmp_pat
     tmp_key_path = tmp_path / "test-key-path"
     tmp_key_path.touch(exist_ok=True)
     monkeypatch.setattr(openstack_builder, "BUILDER_KEY_PATH", tmp_key_path)
+    monkeypatch.setattr(openstack_builder, "BUILDER_KEY_LOCK_PATH", tmp_path / "test-key-lock")
+    monkeypatch.setattr(
+        openstack_builder,
+        "_get_key_fingerprint",
+        MagicMock(return_value=(fingerprint_mock := MagicMock())),
+    )
     connection_mock = MagicMock()
+    connection_mock.compute.find_keypair.return_value.fingerprint = fingerprint_mock
 
     openstack_builder._create_keypair(conn=connection_mock, prefix="")
 
+    connection_mock.delete_keypair.assert_not_called()
     connection_mock.create_keypair.assert_not_called()
 
 
+def test__create_keypair_fingerprint_mismatch(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
+):
+    """
+    arrange: given an OpenStack keypair whose fingerprint differs from the local key.
+    act: when _create_keypair is called.
+    assert: the keypair is recreated.
+    """
+    tmp_key_path = tmp_path / "test-key-path"
+    tmp_key_path.touch(exist_ok=True)
+    monkeypatch.setattr(openstack_builder, "BUILDER_KEY_PATH", tmp_key_path)
+    monkeypatch.setattr(openstack_builder, "BUILDER_KEY_LOCK_PATH", tmp_path / "test-key-lock")
+    monkeypatch.setattr(openstack_builder, "_get_key_fingerprint", MagicMock(return_value="a"))
+    monkeypatch.setattr(openstack_builder.shutil, "chown", MagicMock())
+    connection_mock = MagicMock()
+    connection_mock.compute.find_keypair.return_value.fingerprint = "b"
+    connection_mock.create_keypair.return_value.private_key = "ssh-key-contents"
+
+    openstack_builder._create_keypair(conn=connection_mock, prefix="")
+
+    connection_mock.delete_keypair.assert_called_once()
+    connection_mock.create_keypair.assert_called_once()
+
+
 def test__create_keypair(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path):
     """
     arrange: given monkeypatched openstack connection with keys and mocked key path that exists.
@@ -128,9 +238,10 @@ def test__create_keypair(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path
     """
     test_key_path = tmp_path / "test_path"
     monkeypatch.setattr(openstack_builder, "BUILDER_KEY_PATH", test_key_path)
+    monkeypatch.setattr(openstack_builder, "BUILDER_KEY_LOCK_PATH", tmp_path / "test_lock")
     monkeypatch.setattr(openstack_builder.shutil, "chown", MagicMock())
     connection_mock = MagicMock()
-    connection_mock.get_keypair.return_value = None
+    connection_mock.compute.find_keypair.return_value = None
     connection_mock.create_keypair.return_value = (mock_key := MagicMock())
     mock_key.private_key = "ssh-key-contents"
 
@@ -147,24 +258,76 @@ def test__create_security_group_already_exists():
     assert: create functions are not called.
     """
     connection_mock = MagicMock()
+    connection_mock.network.security_groups.return_value = [MagicMock()]
 
     openstack_builder._create_security_group(conn=connection_mock)
 
-    connection_mock.create_security_group.assert_not_called()
+    connection_mock.network.create_security_group.assert_not_called()
+    connection_mock.delete_security_group.assert_not_called()
 
 
 def test__create_security_group():
     """
     arrange: given a mocked openstack connection that returns no security group.
     act: when _create_security_group is called.
-    assert: create functions not called.
+    assert: the security group and its rules are created.
     """
     connection_mock = MagicMock()
-    connection_mock.get_security_group.return_value = False
+    connection_mock.network.security_groups.side_effect = [[], [MagicMock()]]
 
     openstack_builder._create_security_group(conn=connection_mock)
 
-    connection_mock.create_security_group.assert_called()
+    connection_mock.network.create_security_group.assert_called()
+    assert connection_mock.create_security_group_rule.call_count == len(
+        openstack_builder.SHARED_SECURITY_GROUP_RULES
+    )
+
+
+def test__create_security_group_duplicates():
+    """
+    arrange: given a mocked openstack connection that returns a security group created \
+        concurrently along with the created one.
+    act: when _create_security_group is called.
+    assert: the oldest security group is used and the other one is deleted.
+    """
+    connection_mock = MagicMock()
+    connection_mock.network.security_groups.side_effect = [
+        [],
+        [
+            (newer := MagicMock(created_at="2024-01-01T00:00:01Z", id="b")),
+            (older := MagicMock(created_at="2024-01-01T00:00:00Z", id="a")),
+        ],
+    ]
+    connection_mock.create_security_group_rule.side_effect = openstack.exceptions.ConflictException
+
+    openstack_builder._create_security_group(conn=connection_mock)
+
+    connection_mock.delete_security_group.assert_called_once_with(name_or_id=newer.id)
+    connection_mock.network.security_group_rules.assert_called_once_with(
+        security_group_id=older.id
+    )
+
+
+def test__create_security_group_existing_rules():
+    """
+    arrange: given a mocked openstack connection that returns a security group with all rules.
+    act: when _create_security_group is called.
+    assert: no security group rules are created.
+    """
+    connection_mock = MagicMock()
+    connection_mock.network.security_groups.return_value = [MagicMock()]
+    connection_mock.network.security_group_rules.return_value = [
+        MagicMock(
+            protocol=rule["protocol"],
+            port_range_min=rule.get("port_range_min"),
+            direction=rule["direction"],
+        )
+        for rule in openstack_builder.SHARED_SECURITY_GROUP_RULES
+    ]
+
+    openstack_builder._create_security_group(conn=connection_mock)
+
+    connection_mock.create_security_group_rule.assert_not_called()
 
 
 @pytest.mark.parametrize(
@@ -235,6 +398,9 @@ def test_run(monkeypatch: pytest.MonkeyPatch, cloud_config: openstack_builder.Cl
         "connect",
         MagicMock(return_value=connection_enter_mock),
     )
+    monkeypatch.setattr(
+        openstack_builder, "_wait_for_server_active", (wait_server_mock := MagicMock())
+    )
     monkeypatch.setattr(
         openstack_builder, "_wait_for_cloud_init_complete", (wait_cloud_init_mock := MagicMock())
     )
@@ -252,9 +418,11 @@ def test_run(monkeypatch: pytest.MonkeyPatch, cloud_config: openstack_builder.Cl
     ensure_resources_mock.assert_called()
     determine_flavor_mock.assert_called()
     determine_network_mock.assert_called()
+    wait_server_mock.assert_called()
     wait_cloud_init_mock.assert_called()
     wait_snapshot_mock.assert_called()
     create_image_snapshot.assert_called()
+    assert create_image_snapshot.call_args.kwargs["connection"] == connection_mock
     connection_mock.create_server.assert_called()
     connection_mock.delete_server.assert_called()
 
@@ -270,8 +438,8 @@ def test__prepare_openstack_resources_invalid_resources(monkeypatch: pytest.Monk
         openstack_builder, "_create_security_group", create_security_group_mock := MagicMock()
     )
     connection_mock = MagicMock()
-    connection_mock.get_keypair.return_value = None
-    connection_mock.search_security_groups.return_value = [MagicMock(), MagicMock()]
+    connection_mock.compute.find_keypair.return_value = None
+    connection_mock.network.security_groups.return_value = [MagicMock(), MagicMock()]
     connection_mock.search_servers.return_value = [MagicMock(), MagicMock()]
 
     openstack_builder._prepare_openstack_resources(
@@ -284,12 +452,14 @@ def test__prepare_openstack_resources_invalid_resources(monkeypatch: pytest.Monk
     connection_mock.delete_server.assert_called()
 
 
-def test__prepare_openstack_resources(monkeypatch: pytest.MonkeyPatch):
+def test__prepare_openstack_resources(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path):
     """
     arrange: given clean OpenStack resources state.
     act: when _prepare_openstack_resources is called.
     assert: no recovery functions are called.
     """
+    (tmp_key_path := tmp_path / "test-key-path").touch()
+    monkeypatch.setattr(openstack_builder, "BUILDER_KEY_PATH", tmp_key_path)
     monkeypatch.setattr(openstack_builder, "_create_keypair", create_keypair_mock := MagicMock())
     monkeypatch.setattr(
         openstack_builder,
@@ -300,9 +470,9 @@ def test__prepare_openstack_resources(monkeypatch: pytest.MonkeyPatch):
         openstack_builder, "_create_security_group", create_security_group_mock := MagicMock()
     )
     connection_mock = MagicMock()
-    connection_mock.get_keypair.return_value = (keypair_mock := MagicMock())
+    connection_mock.compute.find_keypair.return_value = (keypair_mock := MagicMock())
     keypair_mock.fingerprint = fingerprint_mock
-    connection_mock.search_security_groups.return_value = [MagicMock()]
+    connection_mock.network.security_groups.return_value = [MagicMock()]
     connection_mock.search_servers.return_value = []
 
     openstack_builder._prepare_openstack_resources(
@@ -383,12 +553,15 @@ def test__determine_flavor_no_flavor():
     assert: FlavorNotFoundError is raised.
     """
     mock_connection = MagicMock()
-    mock_connection.list_flavors.return_value = []
+    mock_connection.compute.flavors.return_value = []
 
     with pytest.raises(errors.FlavorNotFoundError) as exc:
         openstack_builder._determine_flavor(conn=mock_connection, flavor_name=None)
 
     assert "No suitable flavor found" in str(exc)
+    mock_connection.compute.flavors.assert_called_once_with(
+        details=True, min_ram=openstack_builder.MIN_RAM, min_disk=openstack_builder.MIN_DISK
+    )
 
 
 class Flavor(typing.NamedTuple):
@@ -460,7 +633,7 @@ def test__determine_flavor(
     """
     mock_connection = MagicMock()
     mock_connection.get_flavor = MagicMock(return_value=expected_flavor)
-    mock_connection.list_flavors.return_value = flavors
+    mock_connection.compute.flavors.return_value = flavors
 
     assert (
         openstack_builder._determine_flavor(conn=mock_connection, flavor_name=name)
@@ -894,6 +1067,57 @@ def test__wait_for_cloud_init_unexpected_exit(monkeypatch: pytest.MonkeyPatch):
     get_log_mock.assert_called_once()
 
 
+def test__wait_for_cloud_init_complete_timeout(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a monkeypatched _get_ssh_connection and connection.run functions that never\
+        report cloud-init as done.
+    act: when _wait_for_cloud_init_complete is called.
+    assert: TimeoutError is raised.
+    """
+    # patch tenacity retry to speed up testing
+    monkeypatch.setattr(
+        openstack_builder._poll_cloud_init_complete.retry, "wait", tenacity.wait_none()
+    )
+    monkeypatch.setattr(
+        openstack_builder._poll_cloud_init_complete.retry, "stop", tenacity.stop_after_attempt(2)
+    )
+    mock_connection = MagicMock()
+    mock_connection.run.return_value.stdout = "status: running"
+    monkeypatch.setattr(
+        openstack_builder, "_get_ssh_connection", MagicMock(return_value=mock_connection)
+    )
+
+    with pytest.raises(TimeoutError):
+        openstack_builder._wait_for_cloud_init_complete(
+            conn=mock_connection, server=MagicMock(), ssh_key=MagicMock()
+        )
+
+    assert mock_connection.run.call_count == 2
+
+
+def test__wait_for_cloud_init_command_timed_out(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a monkeypatched _get_ssh_connection and connection.run function that times out\
+        waiting for cloud-init.
+    act: when _wait_for_cloud_init_complete is called.
+    assert: TimeoutError is raised.
+    """
+    mock_connection = MagicMock()
+    mock_connection.run.side_effect = openstack_builder.invoke.exceptions.CommandTimedOut(
+        result=MagicMock(), timeout=openstack_builder.CLOUD_INIT_WAIT_TIMEOUT
+    )
+    monkeypatch.setattr(
+        openstack_builder, "_get_ssh_connection", MagicMock(return_value=mock_connection)
+    )
+
+    with pytest.raises(TimeoutError):
+        openstack_builder._wait_for_cloud_init_complete(
+            conn=mock_connection, server=MagicMock(), ssh_key=MagicMock()
+        )
+
+    mock_connection.run.assert_called_once()
+
+
 def test__wait_for_cloud_init_complete(monkeypatch: pytest.MonkeyPatch):
     """
     arrange: given a monkeypatched _get_ssh_connection and connection.run functions.
@@ -901,26 +1125,33 @@ def test__wait_for_cloud_init_complete(monkeypatch: pytest.MonkeyPatch):
     assert: True is returned.
     """
     # patch tenacity retry to speed up testing
-    openstack_builder._wait_for_cloud_init_complete.retry.wait = tenacity.wait_none()
-    openstack_builder._wait_for_cloud_init_complete.retry.stop = tenacity.stop_after_attempt(1)
+    openstack_builder._poll_cloud_init_complete.retry.wait = tenacity.wait_none()
+    openstack_builder._poll_cloud_init_complete.retry.stop = tenacity.stop_after_attempt(2)
     mock_connection = MagicMock()
-    result_mock = MagicMock()
-    result_mock.stdout = "status: done"
-    mock_connection.run.return_value = result_mock
+    running_result_mock = MagicMock()
+    running_result_mock.stdout = "status: running"
+    done_result_mock = MagicMock()
+    done_result_mock.stdout = "status: done"
+    mock_connection.run.side_effect = [running_result_mock, done_result_mock]
     monkeypatch.setattr(
-        openstack_builder, "_get_ssh_connection", MagicMock(return_value=mock_connection)
+        openstack_builder,
+        "_get_ssh_connection",
+        get_ssh_connection_mock := MagicMock(return_value=mock_connection),
     )
 
     assert openstack_builder._wait_for_cloud_init_complete(
         conn=mock_connection, server=MagicMock(), ssh_key=MagicMock()
     )
+    get_ssh_connection_mock.assert_called_once()
+    mock_connection.transport.set_keepalive.assert_called_once()
+    mock_connection.__exit__.assert_called_once()
 
 
 def test__get_ssh_connection_no_networks():
     """
-    arrange: given a mocked connection.get_server function that returns server with no addresses.
+    arrange: given a server with no addresses that are not populated on refresh either.
     act: when _get_ssh_connection is called.
-    assert: AddressNotFoundError is raised.
+    assert: AddressNotFoundError is raised after refreshing the server.
     """
     # patch tenacity retry to speed up testing
     openstack_builder._get_ssh_connection.retry.wait = tenacity.wait_none()
@@ -928,19 +1159,20 @@ def test__get_ssh_connection_no_networks():
     connection_mock = MagicMock()
     server_mock = MagicMock()
     server_mock.addresses = {}
-    connection_mock.get_server = MagicMock(return_value=server_mock)
+    connection_mock.compute.get_server.return_value = server_mock
 
     with pytest.raises(errors.AddressNotFoundError) as exc:
         openstack_builder._get_ssh_connection(
-            conn=connection_mock, server=MagicMock(), ssh_key=MagicMock()
+            conn=connection_mock, server=server_mock, ssh_key=MagicMock()
         )
 
     assert "No addresses found for" in str(exc)
+    connection_mock.compute.get_server.assert_called_once_with(server_mock.id)
 
 
 def test__get_ssh_connection_ssh_exception(monkeypatch: pytest.MonkeyPatch):
     """
-    arrange: given a mocked connection that raises SSHException on command execution.
+    arrange: given a mocked connection that raises SSHException on connection.
     act: when _get_ssh_connection is called.
     assert: AddressNotFoundError is raised.
     """
@@ -953,56 +1185,52 @@ def test__get_ssh_connection_ssh_exception(monkeypatch: pytest.MonkeyPatch):
         "test_addr_1": [{"addr": "test-address-1"}],
         "test_addr_2": [{"addr": "test-address-2"}],
     }
-    connection_mock.get_server = MagicMock(return_value=server_mock)
+    monkeypatch.setattr(openstack_builder, "_is_ssh_port_open", MagicMock(return_value=True))
     ssh_connection_mock = MagicMock()
-    ssh_connection_mock.run.side_effect = paramiko.ssh_exception.SSHException
+    ssh_connection_mock.open.side_effect = paramiko.ssh_exception.SSHException
     monkeypatch.setattr(
         openstack_builder.fabric, "Connection", MagicMock(return_value=ssh_connection_mock)
     )
 
     with pytest.raises(errors.AddressNotFoundError) as exc:
         openstack_builder._get_ssh_connection(
-            conn=connection_mock, server=MagicMock(), ssh_key=MagicMock()
+            conn=connection_mock, server=server_mock, ssh_key=MagicMock()
         )
 
     assert "No connectable SSH addresses found" in str(exc)
 
 
-def test__get_ssh_connection_ssh_invalid_result(monkeypatch: pytest.MonkeyPatch):
+def test__get_ssh_connection_port_closed(monkeypatch: pytest.MonkeyPatch):
     """
-    arrange: given a mocked connection that returns invalid result.
+    arrange: given server addresses that do not accept TCP connections on the SSH port.
     act: when _get_ssh_connection is called.
-    assert: AddressNotFoundError is raised.
+    assert: AddressNotFoundError is raised without attempting an SSH connection.
     """
     # patch tenacity retry to speed up testing
     openstack_builder._get_ssh_connection.retry.wait = tenacity.wait_none()
     openstack_builder._get_ssh_connection.retry.stop = tenacity.stop_after_attempt(1)
     connection_mock = MagicMock()
     server_mock = MagicMock()
-    server_mock.addresses = {
-        "test_addr_1": [{"addr": "test-address-1"}],
-        "test_addr_2": [{"addr": "test-address-2"}],
-    }
-    connection_mock.get_server = MagicMock(return_value=server_mock)
-    ssh_connection_mock = MagicMock()
-    ssh_connection_mock.run.return_value = None
+    server_mock.addresses = {"test_addr_1": [{"addr": "test-address-1"}]}
+    monkeypatch.setattr(openstack_builder, "_is_ssh_port_open", MagicMock(return_value=False))
     monkeypatch.setattr(
-        openstack_builder.fabric, "Connection", MagicMock(return_value=ssh_connection_mock)
+        openstack_builder.fabric, "Connection", fabric_connection_mock := MagicMock()
     )
 
     with pytest.raises(errors.AddressNotFoundError) as exc:
         openstack_builder._get_ssh_connection(
-            conn=connection_mock, server=MagicMock(), ssh_key=MagicMock()
+            conn=connection_mock, server=server_mock, ssh_key=MagicMock()
         )
 
     assert "No connectable SSH addresses found" in str(exc)
+    fabric_connection_mock.assert_not_called()
 
 
-def test__get_ssh_connection_ssh_invalid_stdout(monkeypatch: pytest.MonkeyPatch):
+def test__get_ssh_connection_ssh(monkeypatch: pytest.MonkeyPatch):
     """
-    arrange: given a mocked connection that returns invalid stdout.
+    arrange: given server addresses of which only the second accepts TCP connections.
     act: when _get_ssh_connection is called.
-    assert: AddressNotFoundError is raised.
+    assert: the connection to the reachable address is returned.
     """
     # patch tenacity retry to speed up testing
     openstack_builder._get_ssh_connection.retry.wait = tenacity.wait_none()
@@ -1013,53 +1241,105 @@ def test__get_ssh_connection_ssh_invalid_stdout(monkeypatch: pytest.MonkeyPatch)
         "test_addr_1": [{"addr": "test-address-1"}],
         "test_addr_2": [{"addr": "test-address-2"}],
     }
-    connection_mock.get_server = MagicMock(return_value=server_mock)
+    monkeypatch.setattr(openstack_builder, "_is_ssh_port_open", lambda ip: ip == "test-address-2")
     ssh_connection_mock = MagicMock()
-    result_mock = MagicMock()
-    result_mock.stdout = "invalid"
-    ssh_connection_mock.run.return_value = result_mock
     monkeypatch.setattr(
-        openstack_builder.fabric, "Connection", MagicMock(return_value=ssh_connection_mock)
+        openstack_builder.fabric,
+        "Connection",
+        fabric_connection_mock := MagicMock(return_value=ssh_connection_mock),
     )
 
-    with pytest.raises(errors.AddressNotFoundError) as exc:
+    assert (
         openstack_builder._get_ssh_connection(
-            conn=connection_mock, server=MagicMock(), ssh_key=MagicMock()
+            conn=connection_mock, server=server_mock, ssh_key=MagicMock()
         )
+        == ssh_connection_mock
+    )
+    fabric_connection_mock.assert_called_once()
+    assert fabric_connection_mock.call_args.kwargs["host"] == "test-address-2"
+    connection_mock.compute.get_server.assert_not_called()
+    ssh_connection_mock.open.assert_called_once()
 
-    assert "No connectable SSH addresses found" in str(exc)
 
+@pytest.mark.parametrize(
+    "create_connection_side_effect, expected_result",
+    [
+        pytest.param(ConnectionRefusedError, False, id="connection refused"),
+        pytest.param(TimeoutError, False, id="connection timeout"),
+        pytest.param(None, True, id="connection accepted"),
+    ],
+)
+def test__is_ssh_port_open(
+    monkeypatch: pytest.MonkeyPatch,
+    create_connection_side_effect: type[Exception] | None,
+    expected_result: bool,
+):
+    """
+    arrange: given a monkeypatched socket.create_connection.
+    act: when _is_ssh_port_open is called.
+    assert: whether the SSH port accepted the connection is returned.
+    """
+    monkeypatch.setattr(
+        openstack_builder.socket,
+        "create_connection",
+        MagicMock(side_effect=create_connection_side_effect),
+    )
+
+    assert openstack_builder._is_ssh_port_open("test-address") == expected_result
 
-def test__get_ssh_connection_ssh(monkeypatch: pytest.MonkeyPatch):
+
+def test__wait_for_server_active_timeout(monkeypatch: pytest.MonkeyPatch):
     """
-    arrange: given a mocked connection that returns valid stdout.
-    act: when _get_ssh_connection is called.
-    assert: expected connection is returned.
+    arrange: given a mocked get_server function that returns a building server.
+    act: when _wait_for_server_active is called.
+    assert: TimeoutError is raised.
     """
     # patch tenacity retry to speed up testing
-    openstack_builder._get_ssh_connection.retry.wait = tenacity.wait_none()
-    openstack_builder._get_ssh_connection.retry.stop = tenacity.stop_after_attempt(1)
-    connection_mock = MagicMock()
-    server_mock = MagicMock()
-    server_mock.addresses = {
-        "test_addr_1": [{"addr": "test-address-1"}],
-        "test_addr_2": [{"addr": "test-address-2"}],
-    }
-    connection_mock.get_server = MagicMock(return_value=server_mock)
-    ssh_connection_mock = MagicMock()
-    result_mock = MagicMock()
-    result_mock.ok = True
-    result_mock.stdout = "hello world"
-    ssh_connection_mock.run.return_value = result_mock
+    monkeypatch.setattr(openstack_builder._poll_server_active.retry, "wait", tenacity.wait_none())
     monkeypatch.setattr(
-        openstack_builder.fabric, "Connection", MagicMock(return_value=ssh_connection_mock)
+        openstack_builder._poll_server_active.retry, "stop", tenacity.stop_after_attempt(3)
     )
+    connection_mock = MagicMock()
+    connection_mock.compute.get_server.return_value = MagicMock(status="BUILD")
+
+    with pytest.raises(TimeoutError):
+        openstack_builder._wait_for_server_active(conn=connection_mock, server=MagicMock())
+
+    assert connection_mock.compute.get_server.call_count == 3
+
+
+def test__wait_for_server_active_error(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked get_server function that returns a server in error state.
+    act: when _wait_for_server_active is called.
+    assert: OpenstackError is raised without further polling.
+    """
+    # patch tenacity retry to speed up testing
+    monkeypatch.setattr(openstack_builder._poll_server_active.retry, "wait", tenacity.wait_none())
+    connection_mock = MagicMock()
+    connection_mock.compute.get_server.return_value = MagicMock(status="ERROR")
+
+    with pytest.raises(errors.OpenstackError):
+        openstack_builder._wait_for_server_active(conn=connection_mock, server=MagicMock())
+
+    connection_mock.compute.get_server.assert_called_once()
+
+
+def test__wait_for_server_active(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked get_server function that returns an active server after building.
+    act: when _wait_for_server_active is called.
+    assert: the active server is returned.
+    """
+    # patch tenacity retry to speed up testing
+    monkeypatch.setattr(openstack_builder._poll_server_active.retry, "wait", tenacity.wait_none())
+    connection_mock = MagicMock()
+    active_server = MagicMock(status="ACTIVE")
+    connection_mock.compute.get_server.side_effect = [MagicMock(status="BUILD"), active_server]
 
     assert (
-        openstack_builder._get_ssh_connection(
-            conn=connection_mock, server=MagicMock(), ssh_key=MagicMock()
-        )
-        == ssh_connection_mock
+        openstack_builder._wait_for_server_active(conn=connection_mock, server=MagicMock())
+        == active_server
     )
 
 
@@ -1078,15 +1358,23 @@ def test__wait_for_snapshot_complete_non_active(
     act: when _wait_for_snapshot_complete is called.
     assert: TimeoutError is raised.
     """
-    monkeypatch.setattr(openstack_builder.time, "sleep", MagicMock())
+    # patch tenacity retry to speed up testing
+    monkeypatch.setattr(
+        openstack_builder._poll_snapshot_active.retry, "wait", tenacity.wait_none()
+    )
+    monkeypatch.setattr(
+        openstack_builder._poll_snapshot_active.retry, "stop", tenacity.stop_after_attempt(3)
+    )
     connection_mock = MagicMock()
     image_mock = MagicMock()
     image_mock.status = image_status
-    connection_mock.get_image.return_value = image_mock
+    connection_mock.image.get_image.return_value = image_mock
 
     with pytest.raises(TimeoutError):
         openstack_builder._wait_for_snapshot_complete(conn=connection_mock, image=MagicMock())
 
+    assert connection_mock.image.get_image.call_count == 3
+
 
 @pytest.mark.parametrize(
     "num_not_active",
@@ -1101,15 +1389,184 @@ def test__wait_for_snapshot_complete(monkeypatch: pytest.MonkeyPatch, num_not_ac
     act: when _wait_for_snapshot_complete is called.
     assert: no errors are raised.
     """
-    monkeypatch.setattr(openstack_builder.time, "sleep", MagicMock())
+    # patch tenacity retry to speed up testing
+    monkeypatch.setattr(
+        openstack_builder._poll_snapshot_active.retry, "wait", tenacity.wait_none()
+    )
     connection_mock = MagicMock()
     not_active_mock = MagicMock()
     not_active_mock.status = "saving"
     image_mock = MagicMock()
     image_mock.status = "active"
-    connection_mock.get_image.side_effect = [*[not_active_mock] * num_not_active, image_mock]
+    connection_mock.image.get_image.side_effect = [*[not_active_mock] * num_not_active, image_mock]
 
     assert (
         openstack_builder._wait_for_snapshot_complete(conn=connection_mock, image=MagicMock())
         is None
     )
+
+
+@pytest.mark.parametrize(
+    "image_status",
+    [
+        pytest.param("killed", id="Killed status"),
+        pytest.param("deleted", id="Deleted status"),
+    ],
+)
+def test__wait_for_snapshot_complete_failed(monkeypatch: pytest.MonkeyPatch, image_status: str):
+    """
+    arrange: given a mocked get_image function that returns an image with failed status.
+    act: when _wait_for_snapshot_complete is called.
+    assert: OpenstackError is raised without retrying.
+    """
+    monkeypatch.setattr(
+        openstack_builder._poll_snapshot_active.retry, "wait", tenacity.wait_none()
+    )
+    connection_mock = MagicMock()
+    image_mock = MagicMock()
+    image_mock.status = image_status
+    connection_mock.image.get_image.return_value = image_mock
+
+    with pytest.raises(errors.OpenstackError):
+        openstack_builder._wait_for_snapshot_complete(conn=connection_mock, image=MagicMock())
+
+    connection_mock.image.get_image.assert_called_once()
+
+
+def test__stream_snapshot(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked snapshot download and monkeypatched upload_image_data.
+    act: when _stream_snapshot is called.
+    assert: the downloaded snapshot bytes are streamed into the upload.
+    """
+    uploaded: list[bytes] = []
+    readable: list[bool] = []
+
+    def upload_image_data(image_data: typing.BinaryIO, **_kwargs: typing.Any) -> MagicMock:
+        """Read the streamed image data.
+
+        Args:
+            image_data: The image data stream.
+            _kwargs: The other upload arguments.
+
+        Returns:
+            The uploaded image mock.
+        """
+        readable.append(image_data.readable())
+        uploaded.append(image_data.read())
+        return MagicMock()
+
+    monkeypatch.setattr(store, "upload_image_data", upload_image_data)
+    connection_mock = MagicMock()
+    connection_mock.download_image.side_effect = lambda output_file, **_: output_file.write(
+        b"snapshot"
+    )
+
+    openstack_builder._stream_snapshot(
+        conn=connection_mock,
+        image=MagicMock(),
+        cloud_name="test-cloud",
+        upload_cloud_config=MagicMock(),
+    )
+
+    assert readable == [True]
+    assert uploaded == [b"snapshot"]
+
+
+def test__stream_snapshot_submit_error(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a thread pool that fails to submit the snapshot download.
+    act: when _stream_snapshot is called.
+    assert: the error is raised and both ends of the pipe are closed.
+    """
+    pipe_fds: list[int] = []
+
+    def pipe() -> tuple[int, int]:
+        """Create a pipe and record its file descriptors.
+
+        Returns:
+            The read and write file descriptors.
+        """
+        fds = os_pipe()
+        pipe_fds.extend(fds)
+        return fds
+
+    os_pipe = os.pipe
+    monkeypatch.setattr(openstack_builder.os, "pipe", pipe)
+    monkeypatch.setattr(
+        concurrent.futures.ThreadPoolExecutor,
+        "submit",
+        MagicMock(side_effect=RuntimeError("cannot schedule new futures")),
+    )
+
+    with pytest.raises(RuntimeError):
+        openstack_builder._stream_snapshot(
+            conn=MagicMock(),
+            image=MagicMock(),
+            cloud_name="test-cloud",
+            upload_cloud_config=MagicMock(),
+        )
+
+    assert len(pipe_fds) == 2
+    for fd in pipe_fds:
+        with pytest.raises(OSError):
+            os.fstat(fd)
+
+
+def test__stream_snapshot_download_error(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked snapshot download that fails after writing partial contents.
+    act: when _stream_snapshot is called.
+    assert: the download error is raised instead of uploading a truncated image.
+    """
+    monkeypatch.setattr(
+        store,
+        "upload_image_data",
+        lambda image_data, **_: image_data.read(),
+    )
+    connection_mock = MagicMock()
+
+    def download_image(output_file: typing.BinaryIO, **_kwargs: typing.Any) -> None:
+        """Write partial snapshot contents and fail.
+
+        Args:
+            output_file: The file to write the snapshot to.
+            _kwargs: The other download arguments.
+
+        Raises:
+            SDKException: Always.
+        """
+        output_file.write(b"snap")
+        raise openstack.exceptions.SDKException("Download interrupted.")
+
+    connection_mock.download_image.side_effect = download_image
+
+    with pytest.raises(openstack.exceptions.SDKException):
+        openstack_builder._stream_snapshot(
+            conn=connection_mock,
+            image=MagicMock(),
+            cloud_name="test-cloud",
+            upload_cloud_config=MagicMock(),
+        )
+
+
+def test__upload_to_clouds_source_cloud(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given upload cloud names that include the source cloud.
+    act: when _upload_to_clouds is called.
+    assert: the snapshot is streamed only to the other clouds.
+    """
+    monkeypatch.setattr(openstack_builder, "_stream_snapshot", stream_snapshot_mock := MagicMock())
+    image = MagicMock()
+
+    images = openstack_builder._upload_to_clouds(
+        conn=MagicMock(),
+        image=image,
+        cloud_name="test-cloud",
+        upload_cloud_names=["test-cloud", "test-cloud-1"],
+        upload_cloud_config=MagicMock(),
+    )
+
+    assert images == (image, stream_snapshot_mock.return_value)
+    stream_snapshot_mock.assert_called_once()
+    assert stream_snapshot_mock.call_args.kwargs["cloud_name"] == "test-cloud-1"
@@ -6,12 +6,14 @@
 # Need access to protected functions for testing
 # pylint:disable=protected-access
 
-from unittest.mock import MagicMock
+from pathlib import Path
+from unittest.mock import ANY, MagicMock
 
 import pytest
 from openstack.connection import Connection
 
 from github_runner_image_builder import store
+from github_runner_image_builder.config import Arch
 from github_runner_image_builder.store import Image, OpenstackError, UploadImageError, openstack
 from tests.unit.factories import MockOpenstackImageFactory
 
@@ -65,13 +67,35 @@ def test_create_image_snapshot(monkeypatch: pytest.MonkeyPatch, mock_connection:
     prune_images_mock.assert_called_once()
 
 
+def test_create_image_snapshot_with_connection(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given an already established openstack connection.
+    act: when create_snapshot is called with the connection.
+    assert: the snapshot is created with the given connection without opening a new one.
+    """
+    monkeypatch.setattr(openstack, "connect", connect_mock := MagicMock())
+    monkeypatch.setattr(store, "_prune_old_images", MagicMock())
+    connection = MagicMock(spec=Connection)
+
+    store.create_snapshot(
+        cloud_name=MagicMock(),
+        image_name=MagicMock(),
+        server=MagicMock(),
+        keep_revisions=3,
+        connection=connection,
+    )
+
+    connection.create_image_snapshot.assert_called_once()
+    connect_mock.assert_not_called()
+
+
 def test__get_sorted_images_by_created_at_error(mock_connection: MagicMock):
     """
     arrange: given a mocked openstack connection that returns images in non-sorted order.
     act: when _get_sorted_images_by_created_at is called.
     assert: the images are returned in sorted order by creation date.
     """
-    mock_connection.search_images.side_effect = openstack.exceptions.OpenStackCloudException(
+    mock_connection.image.images.side_effect = openstack.exceptions.OpenStackCloudException(
         "Network error"
     )
 
@@ -83,19 +107,44 @@ def test__get_sorted_images_by_created_at_error(mock_connection: MagicMock):
 
 def test__get_sorted_images_by_created_at(mock_connection: MagicMock):
     """
-    arrange: given a mocked openstack connection that returns images in non-sorted order.
+    arrange: given a mocked openstack connection that returns images sorted by Glance.
     act: when _get_sorted_images_by_created_at is called.
-    assert: the images are returned in sorted order by creation date.
+    assert: the images are requested sorted by creation date and returned in order.
     """
-    mock_connection.search_images.return_value = [
-        (first := MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z")),
-        (third := MockOpenstackImageFactory(id="3", created_at="2024-03-03T00:00:00Z")),
-        (second := MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z")),
-    ]
+    mock_connection.image.images.return_value = iter(
+        images := [
+            MockOpenstackImageFactory(id="3", created_at="2024-03-03T00:00:00Z"),
+            MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z"),
+            MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
+        ]
+    )
+
+    assert (
+        store._get_sorted_images_by_created_at(connection=mock_connection, image_name="test")
+        == images
+    )
+    mock_connection.image.images.assert_called_once_with(name="test", sort="created_at:desc")
+
+
+def test__get_sorted_images_by_created_at_limit(mock_connection: MagicMock):
+    """
+    arrange: given a mocked openstack connection that returns more images than the limit.
+    act: when _get_sorted_images_by_created_at is called with a limit.
+    assert: the limit is passed to Glance and only the latest images are returned.
+    """
+    mock_connection.image.images.return_value = iter(
+        [
+            (latest := MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z")),
+            MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
+        ]
+    )
 
     assert store._get_sorted_images_by_created_at(
-        connection=mock_connection, image_name=MagicMock
-    ) == [third, second, first]
+        connection=mock_connection, image_name="test", limit=1
+    ) == [latest]
+    mock_connection.image.images.assert_called_once_with(
+        name="test", sort="created_at:desc", limit=1
+    )
 
 
 def test__prune_old_images_error(mock_connection: MagicMock):
@@ -104,7 +153,7 @@ def test__prune_old_images_error(mock_connection: MagicMock):
     act: when _prune_old_images is called.
     assert: failure to delete is logged.
     """
-    mock_connection.search_images.return_value = [
+    mock_connection.image.images.return_value = [
         MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
         MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z"),
     ]
@@ -118,22 +167,21 @@ def test__prune_old_images_error(mock_connection: MagicMock):
         )
 
 
-def test__prune_old_images_fail(mock_connection: MagicMock):
+def test__prune_old_images_already_deleted(mock_connection: MagicMock):
     """
-    arrange: given a mocked delete function that returns false.
+    arrange: given a mocked delete function that returns false for already deleted images.
     act: when _prune_old_images is called.
-    assert: failure to delete is logged.
+    assert: no error is raised and every image deletion is attempted.
     """
-    mock_connection.search_images.return_value = [
+    mock_connection.image.images.return_value = [
         MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
         MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z"),
     ]
     mock_connection.delete_image.return_value = False
 
-    with pytest.raises(OpenstackError):
-        store._prune_old_images(
-            connection=mock_connection, image_name=MagicMock(), num_revisions=0
-        )
+    store._prune_old_images(connection=mock_connection, image_name=MagicMock(), num_revisions=0)
+
+    assert mock_connection.delete_image.call_count == 2
 
 
 def test__prune_old_images(mock_connection: MagicMock):
@@ -142,7 +190,7 @@ def test__prune_old_images(mock_connection: MagicMock):
     act: when _prune_old_images is called.
     assert: delete mock is called.
     """
-    mock_connection.search_images.return_value = [
+    mock_connection.image.images.return_value = [
         MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
         MockOpenstackImageFactory(id="2", created_at="2024-02-02T00:00:00Z"),
     ]
@@ -151,14 +199,32 @@ def test__prune_old_images(mock_connection: MagicMock):
     store._prune_old_images(connection=mock_connection, image_name=MagicMock(), num_revisions=0)
 
     assert mock_connection.delete_image.call_count == 2
+    assert {call.args[0] for call in mock_connection.delete_image.call_args_list} == {"1", "2"}
+    assert all(not call.kwargs["wait"] for call in mock_connection.delete_image.call_args_list)
+
+
+def test__prune_old_images_keep_all(mock_connection: MagicMock):
+    """
+    arrange: given fewer images than the number of revisions to keep.
+    act: when _prune_old_images is called.
+    assert: no image is deleted.
+    """
+    mock_connection.image.images.return_value = [
+        MockOpenstackImageFactory(id="1", created_at="2024-01-01T00:00:00Z"),
+    ]
 
+    store._prune_old_images(connection=mock_connection, image_name=MagicMock(), num_revisions=2)
 
-def test_upload_image_error(mock_connection: MagicMock):
+    mock_connection.delete_image.assert_not_called()
+
+
+def test_upload_image_error(mock_connection: MagicMock, tmp_path: Path):
     """
     arrange: given a mocked openstack create_image function that raises an exception.
     act: when upload_image is called.
     assert: UploadImageError is raised.
     """
+    (image_path := tmp_path / "image.img").write_bytes(b"image")
     mock_connection.create_image.side_effect = openstack.exceptions.OpenStackCloudException(
         "Resource capacity exceeded."
     )
@@ -168,31 +234,123 @@ def test_upload_image_error(mock_connection: MagicMock):
             arch=MagicMock(),
             cloud_name=MagicMock(),
             image_name=MagicMock(),
-            image_path=MagicMock(),
+            image_path=image_path,
             keep_revisions=MagicMock(),
         )
 
     assert "Resource capacity exceeded." in str(exc.getrepr())
 
 
-def test_upload_image(mock_connection: MagicMock):
+def test_upload_image(mock_connection: MagicMock, tmp_path: Path):
     """
-    arrange: given a mocked openstack create_image function that raises an exception.
+    arrange: given a mocked openstack create_image function.
     act: when upload_image is called.
-    assert: UploadImageError is raised.
+    assert: the image file is uploaded as a qcow2 image with only the supported create_image \
+        arguments.
+    """
+    (image_path := tmp_path / "image.img").write_bytes(b"image")
+    mock_connection.create_image.return_value = (test_image := MockOpenstackImageFactory(id="1"))
+
+    assert (
+        store.upload_image(
+            arch=Arch.X64,
+            cloud_name="test-cloud",
+            image_name="test-image",
+            image_path=image_path,
+            keep_revisions=5,
+        )
+        == test_image
+    )
+    mock_connection.create_image.assert_called_once_with(
+        name="test-image",
+        properties={"architecture": Arch.X64.to_openstack()},
+        allow_duplicates=True,
+        wait=True,
+        data=ANY,
+        disk_format="qcow2",
+        container_format="bare",
+    )
+    assert mock_connection.create_image.call_args.kwargs["data"].name == str(image_path)
+
+
+def test_upload_image_data(mock_connection: MagicMock):
+    """
+    arrange: given a mocked openstack create_image function.
+    act: when upload_image_data is called.
+    assert: the image data is uploaded.
     """
     mock_connection.create_image.return_value = (test_image := MockOpenstackImageFactory(id="1"))
+    image_data = MagicMock()
+
+    assert (
+        store.upload_image_data(
+            arch=MagicMock(),
+            cloud_name=MagicMock(),
+            image_name=MagicMock(),
+            image_data=image_data,
+            disk_format="raw",
+            keep_revisions=MagicMock(),
+        )
+        == test_image
+    )
+    assert mock_connection.create_image.call_args.kwargs["data"] == image_data
+    assert mock_connection.create_image.call_args.kwargs["disk_format"] == "raw"
+
+
+def test_upload_image_with_connection(monkeypatch: pytest.MonkeyPatch, tmp_path: Path):
+    """
+    arrange: given an already established openstack connection.
+    act: when upload_image is called with the connection.
+    assert: the image is uploaded with the given connection without opening a new one.
+    """
+    (image_path := tmp_path / "image.img").write_bytes(b"image")
+    monkeypatch.setattr(openstack, "connect", connect_mock := MagicMock())
+    connection = MagicMock(spec=Connection)
+    connection.create_image.return_value = (test_image := MockOpenstackImageFactory(id="1"))
 
     assert (
         store.upload_image(
             arch=MagicMock(),
             cloud_name=MagicMock(),
             image_name=MagicMock(),
-            image_path=MagicMock(),
+            image_path=image_path,
             keep_revisions=MagicMock(),
+            connection=connection,
         )
         == test_image
     )
+    connect_mock.assert_not_called()
+    connection.close.assert_not_called()
+
+
+def test_connect_error(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked openstack connection that fails to authorize.
+    act: when connect is called.
+    assert: OpenstackError is raised and the connection is closed.
+    """
+    connection = MagicMock(spec=Connection)
+    connection.authorize.side_effect = openstack.exceptions.SDKException("Unauthorized")
+    monkeypatch.setattr(openstack, "connect", MagicMock(return_value=connection))
+
+    with pytest.raises(OpenstackError) as exc:
+        store.connect(cloud_name=MagicMock())
+
+    assert "Unauthorized" in str(exc.getrepr())
+    connection.close.assert_called_once()
+
+
+def test_connect(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: given a mocked openstack connection.
+    act: when connect is called.
+    assert: the authorized connection is returned.
+    """
+    connection = MagicMock(spec=Connection)
+    monkeypatch.setattr(openstack, "connect", MagicMock(return_value=connection))
+
+    assert store.connect(cloud_name=MagicMock()) == connection
+    connection.authorize.assert_called_once()
 
 
 @pytest.mark.usefixtures("mock_connection")
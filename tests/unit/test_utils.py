@@ -3,12 +3,14 @@
 
 """Unit tests for utils module."""
 
+import hashlib
 import logging
+from pathlib import Path
 from unittest.mock import MagicMock
 
 import pytest
 
-from github_runner_image_builder.utils import retry
+from github_runner_image_builder.utils import get_file_digest, retry
 
 
 def test_retry_with_logger():
@@ -76,3 +78,41 @@ def test_retry_no_logger():
         decorated_func()
 
     assert counter.call_count == num_tries
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        pytest.param(b"", id="empty file"),
+        pytest.param(b"test file content", id="non-empty file"),
+    ],
+)
+@pytest.mark.parametrize(
+    "file_digest_available",
+    [
+        pytest.param(True, id="file_digest"),
+        pytest.param(False, id="mmap fallback"),
+    ],
+)
+def test_get_file_digest(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, content: bytes, file_digest_available: bool
+):
+    """
+    arrange: given a file with content, with or without hashlib.file_digest available.
+    act: when get_file_digest is called.
+    assert: the hex digest of the content is returned.
+    """
+    # hashlib.file_digest only exists from Python 3.11, fake it to test both paths on any version.
+    file_digest_mock = MagicMock(
+        side_effect=lambda file, algorithm: hashlib.new(algorithm, file.read())
+    )
+    if file_digest_available:
+        monkeypatch.setattr(hashlib, "file_digest", file_digest_mock, raising=False)
+    else:
+        monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    (test_path := tmp_path / "test").write_bytes(content)
+
+    assert get_file_digest(path=test_path, algorithm="sha256") == (
+        hashlib.sha256(content).hexdigest()
+    )
+    assert file_digest_mock.called == file_digest_available